@@ -25,6 +25,9 @@ class Config:
         self.debug = os.getenv('CLIPPER_DEBUG', 'false').lower() in ('true', '1', 'yes')
         self.reload = os.getenv('CLIPPER_RELOAD', 'false').lower() in ('true', '1', 'yes')
 
+        # Hash renames: sample head/middle/tail of each file instead of hashing every byte
+        self.sampled_rename_hash = os.getenv('CLIPPER_SAMPLED_RENAME_HASH', 'false').lower() in ('true', '1', 'yes')
+
         # Folders to exclude from scanning
         excluded_default = 'Temp,.DS_Store,.clipper,@eaDir'
         excluded_env = os.getenv('CLIPPER_EXCLUDED_FOLDERS', excluded_default)
@@ -1,8 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text, Table, ForeignKey, text, Index, event, select
+from sqlalchemy import create_engine, Column, Integer, String, Float, Text, LargeBinary, Table, ForeignKey, text, Index, event, select, func
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import config
+from pathlib import Path
+from file_scanner import FileScanner
+from utils.constants import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -123,8 +129,43 @@ class Actor(Base):
 
     __table_args__ = (
         Index('idx_actor_name', 'name'),
+        Index('idx_actor_name_lower', func.lower(name), unique=True),  # Case-insensitive uniqueness + lookups
     )
 
+def phash_to_int64(phash: str) -> int:
+    """Convert a hex pHash to the signed 64-bit value stored in VideoFingerprint.phash_int.
+
+    SQLite INTEGER is signed, so hashes with the top bit set wrap to negative.
+    Raises ValueError for non-hex or wider-than-64-bit hashes.
+    """
+    value = int(phash, 16)
+    if value >> 64:
+        raise ValueError(f"pHash wider than 64 bits: {phash!r}")
+    return value - (1 << 64) if value >> 63 else value
+
+# Above this many ids, id_in ships them as one JSON parameter instead of one bound parameter each
+ID_LIST_JSON_THRESHOLD = 500
+
+def id_in(column, ids):
+    """Membership filter for a (possibly large) list of integer ids.
+
+    Small lists use a plain IN. Larger ones are passed as a single JSON array
+    expanded by SQLite's json_each, so the statement text stays the same size
+    and never approaches the bound-parameter limit.
+    """
+    ids = list(ids)
+    if len(ids) <= ID_LIST_JSON_THRESHOLD:
+        return column.in_(ids)
+    id_values = func.json_each(json.dumps(ids)).table_valued('value')
+    return column.in_(select(id_values.c.value))
+
+def _phash_int_default(context):
+    """Column default: derive phash_int from the row's hex phash on insert."""
+    try:
+        return phash_to_int64(context.get_current_parameters()['phash'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
 class VideoFingerprint(Base):
     __tablename__ = "video_fingerprints"
 
@@ -132,6 +173,7 @@ class VideoFingerprint(Base):
     video_id = Column(Integer, ForeignKey('videos.id', ondelete='CASCADE'), nullable=False)
     frame_position = Column(Integer, nullable=False)  # 0, 25, 50, 75, 100 (percentage)
     phash = Column(String, nullable=False)  # 16-char hex string (64-bit perceptual hash)
+    phash_int = Column(Integer, default=_phash_int_default)  # Same hash as a signed 64-bit int (see phash_to_int64) - compared without hex parsing
     created_at = Column(Float, default=lambda: __import__('time').time())
 
     # Relationship to video
@@ -199,7 +241,7 @@ class FaceEncoding(Base):
     face_id = Column(Integer, ForeignKey('face_ids.id', ondelete='CASCADE'), nullable=False)
     video_id = Column(Integer, ForeignKey('videos.id', ondelete='SET NULL'), nullable=True)  # Nullable: preserve encoding if video deleted
     frame_timestamp = Column(Float, nullable=False)  # Seconds into video (0 for image-sourced encodings)
-    encoding = Column(Text, nullable=False)  # 512-D vector as BLOB (stored as base64)
+    encoding = Column(LargeBinary, nullable=False)  # 512-D float32 vector as raw bytes
     thumbnail = Column(Text)  # Base64 encoded JPEG crop of face
     confidence = Column(Float)  # Detection confidence (0-1)
     quality_score = Column(Float)  # Face quality score (sharpness, angle, etc.)
@@ -260,13 +302,49 @@ class FolderGroup(Base):
 engine = None
 AsyncSessionLocal = None
 
+# Bumped on every commit against the active database (and on root switch);
+# read-mostly endpoints key their in-process caches on it
+_data_version = 0
+
+def get_data_version() -> int:
+    """Get the current data version for cache invalidation"""
+    return _data_version
+
+def _bump_data_version():
+    global _data_version
+    _data_version += 1
+
+class VersionedSession(Session):
+    """Session that bumps the data version once its commit has landed"""
+
+# The Connection "commit" event fires before the DBAPI commit, so a reader on
+# another pooled connection can see that bump alongside pre-commit rows and
+# cache them under it. Bumping again after the commit retires those entries.
+@event.listens_for(VersionedSession, "after_commit")
+def bump_data_version_after_commit(session):
+    """Invalidate cached listings after a session commit has completed"""
+    _bump_data_version()
+
+def get_pool_status(target_engine=None) -> dict:
+    """Get connection pool usage for an engine (defaults to the active database)"""
+    target_engine = target_engine or engine
+    if target_engine is None:
+        return {}
+    pool = target_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checked_in": pool.checkedin(),
+    }
+
 def get_database_url():
     """Get database URL for current active root"""
     return f"sqlite+aiosqlite:///{config.database_path}"
 
 async def init_database():
     """Initialize or reinitialize database engine for current root"""
-    global engine, AsyncSessionLocal
+    global engine, AsyncSessionLocal, _data_version
     
     database_url = get_database_url()
     logger.info(f"🔗 Initializing database: {database_url}")
@@ -277,9 +355,17 @@ async def init_database():
         engine = None
         AsyncSessionLocal = None
     
-    # Create new engine
-    engine = create_async_engine(database_url, echo=False)
-    AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+    # Create new engine - pool connections explicitly, aiosqlite defaults to NullPool
+    # (a fresh connection + worker thread + PRAGMA per session)
+    engine = create_async_engine(
+        database_url,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT
+    )
+    AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, sync_session_class=VersionedSession)
     
     # Enable foreign key constraints for SQLite
     @event.listens_for(engine.sync_engine, "connect")
@@ -288,12 +374,23 @@ async def init_database():
         cursor = dbapi_conn.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.close()
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def bump_data_version(conn):
+        """Invalidate cached listings whenever a write is about to be committed"""
+        _bump_data_version()
+
+    # A different root means different data
+    _data_version += 1
     
     # Create tables
     await create_tables()
     
     # Run migrations for existing databases
     await migrate_database()
+
+    # Migrations commit through engine.begin(), outside any session
+    _data_version += 1
     
     logger.info(f"✅ Database initialized for root: {config.current_root_path}")
 
@@ -425,6 +522,12 @@ async def migrate_database():
                 await conn.execute(text("ALTER TABLE videos ADD COLUMN media_type VARCHAR DEFAULT 'video'"))
                 logger.info("✅ media_type column added successfully (default='video' for all existing entries)")
 
+            # Folder-scoped queries (bulk rename, folder rename, move) filter on category.
+            # create_all() only builds indexes for new tables, so backfill them on older databases.
+            # idx_category_subcategory also serves plain `category = ?` lookups via its leading column.
+            await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_category_subcategory ON videos(category, subcategory)"))
+            await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_modified ON videos(modified)"))
+
             # Check if actors table exists
             actors_check = await conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='actors'"))
             actors_exists = actors_check.fetchone() is not None
@@ -442,6 +545,22 @@ async def migrate_database():
                 """))
                 await conn.execute(text("CREATE INDEX idx_actor_name ON actors(name)"))
 
+            # Unique expression index: lower(name) probes seek instead of scanning,
+            # and actor upserts can rely on ON CONFLICT for case-insensitive names
+            actor_lower_index_check = await conn.execute(text("SELECT sql FROM sqlite_master WHERE type='index' AND name='idx_actor_name_lower'"))
+            actor_lower_index = actor_lower_index_check.fetchone()
+            if actor_lower_index is None or 'UNIQUE' not in actor_lower_index[0]:
+                duplicates_check = await conn.execute(text("SELECT lower(name) FROM actors GROUP BY lower(name) HAVING COUNT(*) > 1"))
+                duplicate_names = [row[0] for row in duplicates_check.fetchall()]
+                if duplicate_names:
+                    logger.warning(f"Actors differing only by case, keeping non-unique name index: {duplicate_names[:5]}")
+                    if actor_lower_index is None:
+                        await conn.execute(text("CREATE INDEX idx_actor_name_lower ON actors(lower(name))"))
+                else:
+                    logger.info("Creating unique idx_actor_name_lower index on actors")
+                    await conn.execute(text("DROP INDEX IF EXISTS idx_actor_name_lower"))
+                    await conn.execute(text("CREATE UNIQUE INDEX idx_actor_name_lower ON actors(lower(name))"))
+
             # Check folder_groups table for order column (for group reordering feature)
             folder_groups_check = await conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='folder_groups'"))
             folder_groups_exists = folder_groups_check.fetchone() is not None
@@ -482,6 +601,32 @@ async def migrate_database():
                 await conn.execute(text("CREATE INDEX idx_video_actors_video ON video_actors(video_id)"))
                 await conn.execute(text("CREATE INDEX idx_video_actors_actor ON video_actors(actor_id)"))
 
+            # Keep actors.video_count in sync inside the database so adds/removes
+            # are atomic and associations dropped by video deletes are counted too
+            actor_count_trigger_check = await conn.execute(text("SELECT name FROM sqlite_master WHERE type='trigger' AND name='trg_video_actors_insert'"))
+            if actor_count_trigger_check.fetchone() is None:
+                logger.info("Creating video_count triggers on video_actors")
+                await conn.execute(text("""
+                    CREATE TRIGGER trg_video_actors_insert AFTER INSERT ON video_actors
+                    BEGIN
+                        UPDATE actors SET video_count = COALESCE(video_count, 0) + 1 WHERE id = NEW.actor_id;
+                    END
+                """))
+                await conn.execute(text("""
+                    CREATE TRIGGER trg_video_actors_delete AFTER DELETE ON video_actors
+                    BEGIN
+                        UPDATE actors SET video_count = MAX(COALESCE(video_count, 0) - 1, 0) WHERE id = OLD.actor_id;
+                    END
+                """))
+
+                # Resync counts that drifted while they were maintained in Python
+                await conn.execute(text("""
+                    UPDATE actors
+                    SET video_count = (
+                        SELECT COUNT(*) FROM video_actors WHERE video_actors.actor_id = actors.id
+                    )
+                """))
+
             # Check if video_fingerprints table exists
             fingerprints_check = await conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='video_fingerprints'"))
             fingerprints_exists = fingerprints_check.fetchone() is not None
@@ -494,6 +639,7 @@ async def migrate_database():
                         video_id INTEGER NOT NULL,
                         frame_position INTEGER NOT NULL,
                         phash VARCHAR NOT NULL,
+                        phash_int INTEGER,
                         created_at FLOAT,
                         FOREIGN KEY(video_id) REFERENCES videos(id) ON DELETE CASCADE
                     )
@@ -501,6 +647,28 @@ async def migrate_database():
                 await conn.execute(text("CREATE INDEX idx_fingerprints_video ON video_fingerprints(video_id)"))
                 await conn.execute(text("CREATE INDEX idx_fingerprints_phash ON video_fingerprints(phash)"))
 
+            fp_columns_result = await conn.execute(text("PRAGMA table_info(video_fingerprints)"))
+            fp_columns = [row[1] for row in fp_columns_result.fetchall()]
+
+            if 'phash_int' not in fp_columns:
+                logger.info("Adding phash_int column to video_fingerprints table")
+                await conn.execute(text("ALTER TABLE video_fingerprints ADD COLUMN phash_int INTEGER"))
+
+            # Backfill integer hashes for rows written before the column existed
+            missing_ints = await conn.execute(text("SELECT id, phash FROM video_fingerprints WHERE phash_int IS NULL"))
+            phash_updates = []
+            for fp_id, phash in missing_ints.fetchall():
+                try:
+                    phash_updates.append({"id": fp_id, "phash_int": phash_to_int64(phash)})
+                except (TypeError, ValueError):
+                    logger.warning(f"Skipping invalid fingerprint hash {phash!r} (fingerprint {fp_id})")
+            if phash_updates:
+                logger.info(f"Backfilling phash_int for {len(phash_updates)} fingerprints")
+                await conn.execute(
+                    text("UPDATE video_fingerprints SET phash_int = :phash_int WHERE id = :id"),
+                    phash_updates
+                )
+
             # Check if face_ids table exists
             face_ids_check = await conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='face_ids'"))
             face_ids_exists = face_ids_check.fetchone() is not None
@@ -544,7 +712,7 @@ async def migrate_database():
                         face_id INTEGER NOT NULL,
                         video_id INTEGER NOT NULL,
                         frame_timestamp FLOAT NOT NULL,
-                        encoding TEXT NOT NULL,
+                        encoding BLOB NOT NULL,
                         thumbnail TEXT,
                         confidence FLOAT,
                         quality_score FLOAT,
@@ -614,7 +782,7 @@ async def migrate_database():
                             face_id INTEGER NOT NULL,
                             video_id INTEGER,
                             frame_timestamp FLOAT NOT NULL,
-                            encoding TEXT NOT NULL,
+                            encoding BLOB NOT NULL,
                             thumbnail TEXT,
                             confidence FLOAT,
                             quality_score FLOAT,
@@ -642,6 +810,24 @@ async def migrate_database():
 
                     logger.info("✅ Face encodings migration complete - encodings will now be preserved when videos are deleted")
 
+                # Convert base64 TEXT embeddings written by older versions to raw float32 bytes
+                legacy_encodings = await conn.execute(text("SELECT id, encoding FROM face_encodings WHERE typeof(encoding) = 'text'"))
+                encoding_updates = []
+                for encoding_id, encoding_b64 in legacy_encodings.fetchall():
+                    try:
+                        encoding_bytes = base64.b64decode(encoding_b64)
+                    except (TypeError, ValueError):
+                        # Unreadable either way; store empty so readers treat it as a missing embedding
+                        logger.warning(f"Clearing invalid base64 embedding (encoding {encoding_id})")
+                        encoding_bytes = b""
+                    encoding_updates.append({"id": encoding_id, "encoding": encoding_bytes})
+                if encoding_updates:
+                    logger.info(f"Converting {len(encoding_updates)} face embeddings from base64 to binary")
+                    await conn.execute(
+                        text("UPDATE face_encodings SET encoding = :encoding WHERE id = :id"),
+                        encoding_updates
+                    )
+
         except Exception as e:
             logger.error(f"Error during database migration: {e}")
             # If migration fails, just create all tables (for new databases)
@@ -664,9 +850,6 @@ async def fix_existing_media_types() -> dict:
     Returns:
         dict with statistics: {'videos_fixed': N, 'images_fixed': M, 'errors': []}
     """
-    from pathlib import Path
-    from file_scanner import FileScanner
-    
     scanner = FileScanner()
     stats = {'videos_fixed': 0, 'images_fixed': 0, 'errors': [], 'total_checked': 0, 'no_change_needed': 0}
     
@@ -5,19 +5,26 @@ Handles face encoding generation and similarity matching for the face catalog sy
 """
 
 import numpy as np
+from scipy.linalg.blas import ssyrk
 import cv2
+from PIL import Image
 import base64
+import random
+import subprocess
 import time
 import secrets
 from typing import List, Tuple, Optional, Dict, Any
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from database import FaceID, FaceEncoding, VideoFace, Actor
+from database import FaceID, FaceEncoding, VideoFace, Actor, id_in
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Leader rows compared at a time by group_by_similarity (peak memory ~ rows x N floats)
+SIMILARITY_BLOCK_ROWS = 256
+
 
 class FaceService:
     """Service for face recognition using InsightFace with ONNX Runtime"""
@@ -110,15 +117,106 @@ class FaceService:
         )
         return float(similarity)
 
+    def similarity_matrix(self, encodings: np.ndarray) -> np.ndarray:
+        """
+        Pairwise cosine similarity of an (N, D) encoding matrix, upper triangle only
+
+        Rows are L2-normalized in place (zero rows stay zero), after which cosine
+        similarity is the Gram matrix. BLAS syrk computes only its upper triangle
+        (half the multiply-adds of a full matmul); callers read similarity[i, j]
+        for i <= j, so the lower half is left as zeros rather than mirrored in.
+
+        Args:
+            encodings: Writable (N, D) float matrix, e.g. from bytes_to_encodings
+
+        Returns:
+            (N, N) matrix holding similarities on and above the diagonal
+        """
+        self._normalize_rows(encodings)
+        # encodings.T is Fortran-ordered (D, N): trans=1 gives (N, N) without copying the input
+        return ssyrk(1.0, encodings.T, trans=1)
+
+    def group_by_similarity(self, encodings: np.ndarray, threshold: float) -> List[Tuple[List[int], List[float]]]:
+        """
+        Greedy grouping of encodings by cosine similarity above a threshold
+
+        Each row not yet grouped starts a group and claims every later, ungrouped
+        row whose similarity to it exceeds the threshold. Rows are L2-normalized in
+        place. Similarities are computed SIMILARITY_BLOCK_ROWS leaders at a time and
+        only against rows that are still ungrouped: rows claimed by an earlier
+        leader can never lead or be claimed again, so their dot products are
+        skipped entirely. The result is the same as scanning the full Gram matrix.
+
+        Args:
+            encodings: Writable (N, D) float matrix, e.g. from bytes_to_encodings
+            threshold: Similarity a row must exceed to join a leader's group
+
+        Returns:
+            (row indices, similarity to leader) per group, leader first, in leader
+            order (singletons included)
+        """
+        count = len(encodings)
+        self._normalize_rows(encodings)
+        grouped = np.zeros(count, dtype=bool)
+        groups = []
+
+        for start in range(0, count, SIMILARITY_BLOCK_ROWS):
+            end = min(start + SIMILARITY_BLOCK_ROWS, count)
+            leaders = np.flatnonzero(~grouped[start:end]) + start
+            if not len(leaders):
+                continue
+            # Later rows not yet claimed are the only ones these leaders can claim
+            candidates = np.flatnonzero(~grouped[leaders[0] + 1:]) + leaders[0] + 1
+            block = encodings[leaders] @ encodings[candidates].T
+
+            for leader, similarities in zip(leaders, block):
+                if grouped[leader]:
+                    continue
+                grouped[leader] = True
+                claimed = (similarities > threshold) & (candidates > leader) & ~grouped[candidates]
+                members = candidates[claimed]
+                grouped[members] = True
+                groups.append(([int(leader)] + members.tolist(), [1.0] + similarities[claimed].tolist()))
+
+        return groups
+
+    @staticmethod
+    def _normalize_rows(encodings: np.ndarray) -> None:
+        """L2-normalize rows in place; zero rows stay zero."""
+        norms = np.linalg.norm(encodings, axis=1, keepdims=True)
+        np.divide(encodings, norms, out=encodings, where=norms > 0)
+
+    def encoding_to_bytes(self, encoding: np.ndarray) -> bytes:
+        """Convert numpy encoding to raw float32 bytes for database storage"""
+        return np.asarray(encoding, dtype=np.float32).tobytes()
+
+    def bytes_to_encoding(self, encoding_bytes: bytes) -> np.ndarray:
+        """View stored float32 bytes as a numpy encoding (no copy)"""
+        return np.frombuffer(encoding_bytes, dtype=np.float32)
+
     def encoding_to_base64(self, encoding: np.ndarray) -> str:
-        """Convert numpy encoding to base64 string for database storage"""
+        """Convert numpy encoding to base64 string for API responses"""
         return base64.b64encode(encoding.tobytes()).decode('utf-8')
 
     def base64_to_encoding(self, base64_str: str) -> np.ndarray:
-        """Convert base64 string back to numpy encoding"""
+        """Convert base64 string from an API request back to numpy encoding"""
         bytes_data = base64.b64decode(base64_str)
         return np.frombuffer(bytes_data, dtype=np.float32)
 
+    def bytes_to_encodings(self, encodings_bytes: List[bytes]) -> np.ndarray:
+        """
+        Stack raw stored encodings into one (N, D) float32 matrix
+
+        The buffers are joined once and viewed with a single np.frombuffer, instead of
+        one small array per encoding copied again by np.array(list_of_arrays). The
+        matrix is writable (backed by a bytearray) so callers can normalize in place.
+        """
+        sizes = {len(data) for data in encodings_bytes}
+        if len(sizes) > 1:
+            raise ValueError(f"Encodings have different sizes: {sorted(sizes)} bytes")
+        buffer = bytearray().join(encodings_bytes)
+        return np.frombuffer(buffer, dtype=np.float32).reshape(len(encodings_bytes), -1)
+
     def image_to_base64(self, image: np.ndarray) -> str:
         """Convert image to base64 JPEG string"""
         _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 85])
@@ -176,9 +274,20 @@ class FaceService:
         Returns:
             List of matching face_ids with similarity scores
         """
-        # Load all face encodings from database
-        result = await db.execute(select(FaceEncoding))
-        all_encodings = result.scalars().all()
+        # Load all face encodings from database; thumbnails are fetched for the returned matches only
+        query = select(
+            FaceEncoding.id,
+            FaceEncoding.face_id,
+            FaceEncoding.encoding,
+            FaceEncoding.confidence,
+            FaceEncoding.quality_score,
+            FaceEncoding.video_id,
+            FaceEncoding.frame_timestamp
+        )
+        if exclude_face_id:
+            query = query.where(FaceEncoding.face_id != exclude_face_id)
+        result = await db.execute(query)
+        all_encodings = result.all()
 
         if not all_encodings:
             logger.info("No face encodings in database")
@@ -192,12 +301,8 @@ class FaceService:
 
         for stored_encoding in all_encodings:
             try:
-                # Skip if this encoding belongs to the excluded face
-                if exclude_face_id and stored_encoding.face_id == exclude_face_id:
-                    continue
-                
                 # Decode stored encoding
-                stored_vec = self.base64_to_encoding(stored_encoding.encoding)
+                stored_vec = self.bytes_to_encoding(stored_encoding.encoding)
 
                 # Calculate similarity
                 similarity = self.calculate_similarity(encoding, stored_vec)
@@ -212,7 +317,7 @@ class FaceService:
                         'face_id': face_id,
                         'similarity': similarity,
                         'similarity_percent': round(similarity * 100, 1),
-                        'thumbnail': stored_encoding.thumbnail,
+                        'thumbnail': None,
                         'confidence': stored_encoding.confidence,
                         'quality_score': stored_encoding.quality_score,
                         'video_id': stored_encoding.video_id,
@@ -265,6 +370,16 @@ class FaceService:
         results.sort(key=lambda x: -x['similarity'])
         results = results[:top_k]
 
+        matched_ids = [match['encoding_id'] for r in results for match in r['matched_encodings']]
+        if matched_ids:
+            thumbnails_result = await db.execute(
+                select(FaceEncoding.id, FaceEncoding.thumbnail).where(id_in(FaceEncoding.id, matched_ids))
+            )
+            thumbnails = dict(thumbnails_result.all())
+            for r in results:
+                for match in r['matched_encodings']:
+                    match['thumbnail'] = thumbnails.get(match['encoding_id'])
+
         total_matches = sum(len(r['matched_encodings']) for r in results)
         logger.info(f"Found {len(results)} matching faces with {total_matches} total encodings above threshold {threshold}")
         return results
@@ -342,19 +457,18 @@ class FaceService:
         Returns:
             Created FaceEncoding object, or None if encoding is duplicate
         """
-        # Convert encoding to base64
-        encoding_b64 = self.encoding_to_base64(encoding)
+        encoding_bytes = self.encoding_to_bytes(encoding)
 
         # Check for exact duplicate encoding in this face
         result = await db.execute(
-            select(FaceEncoding).where(
+            select(FaceEncoding.id).where(
                 (FaceEncoding.face_id == face_id) &
-                (FaceEncoding.encoding == encoding_b64)
+                (FaceEncoding.encoding == encoding_bytes)
             )
         )
         existing = result.scalar_one_or_none()
 
-        if existing:
+        if existing is not None:
             logger.info(f"Skipped duplicate encoding for face_id {face_id} - exact match already exists")
             return None  # Return None to indicate duplicate was skipped
 
@@ -363,7 +477,7 @@ class FaceService:
             face_id=face_id,
             video_id=video_id,
             frame_timestamp=frame_timestamp,
-            encoding=encoding_b64,
+            encoding=encoding_bytes,
             thumbnail=thumbnail,
             confidence=confidence,
             quality_score=quality_score,
@@ -399,8 +513,6 @@ class FaceService:
             List of tuples (frame as numpy array, timestamp in seconds)
         """
         try:
-            from PIL import Image
-
             file_ext = Path(image_path).suffix.lower()
             frames = []
 
@@ -484,10 +596,6 @@ class FaceService:
         Returns:
             List of tuples (frame as numpy array, timestamp in seconds)
         """
-        import subprocess
-        import json
-        import random
-
         try:
             # Get video duration if not provided
             if video_duration is None:
@@ -1013,12 +1121,12 @@ class FaceService:
 
             # Find remaining encodings for this face
             result = await db.execute(
-                select(FaceEncoding).where(FaceEncoding.face_id == face_id).order_by(
+                select(FaceEncoding.id).where(FaceEncoding.face_id == face_id).order_by(
                     FaceEncoding.quality_score.desc(),
                     FaceEncoding.confidence.desc()
                 )
             )
-            remaining_encodings = result.scalars().all()
+            remaining_encodings = result.all()
 
             # If this is the last encoding, keep VideoFace mappings but set primary to None
             if face.encoding_count == 0:
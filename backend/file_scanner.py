@@ -3,6 +3,7 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from config import config
 import mimetypes
+import time
 
 class FileScanner:
     def __init__(self):
@@ -191,7 +192,6 @@ class FileScanner:
         }
 
         try:
-            import time
             result['scanned_at'] = time.time()
 
             # Get direct videos and images in this folder only
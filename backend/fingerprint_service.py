@@ -5,18 +5,102 @@ This service generates perceptual hashes (pHash) for videos by extracting key fr
 and comparing them to detect duplicate or similar content.
 """
 
+import base64
 import imagehash
+import io
+from itertools import combinations
 from PIL import Image
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import asyncio
 import logging
 import os
 
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
 logger = logging.getLogger(__name__)
 
+# Set bits per byte value - popcount of uint64 arrays via a byte-wise table lookup
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def int64_hashes_to_uint64(hashes: List[int]) -> np.ndarray:
+    """
+    Reinterpret stored signed 64-bit hashes (VideoFingerprint.phash_int) as uint64
+
+    Args:
+        hashes: phash_int values; None entries (not yet backfilled) are skipped
+
+    Returns:
+        1-D uint64 array
+    """
+    return np.array([h for h in hashes if h is not None], dtype=np.int64).view(np.uint64)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Element-wise number of set bits of a uint64 array (same shape, uint8)"""
+    as_bytes = np.ascontiguousarray(values)[..., None].view(np.uint8)
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+# Multi-index hashing: a 64-bit hash is split into 4 x 16-bit chunks. If two hashes
+# are within distance T, at least one chunk pair is within T // 4 (pigeonhole), so
+# exact-or-near chunk matches give every candidate pair. Above this chunk radius the
+# number of chunk variants to probe grows too fast and a full scan is used instead.
+MIH_CHUNKS = 4
+MIH_MAX_CHUNK_RADIUS = 2
+
+# 16-bit XOR masks with at most r bits set, per radius r
+_MIH_MASKS = {
+    radius: np.array(
+        [sum(1 << bit for bit in bits) for r in range(radius + 1) for bits in combinations(range(16), r)],
+        dtype=np.int64
+    )
+    for radius in range(MIH_MAX_CHUNK_RADIUS + 1)
+}
+
+
+def _mih_candidate_pairs(frames: np.ndarray, owners: np.ndarray, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Frame index pairs (a, b) sharing a 16-bit chunk within radius, with owners[a] < owners[b]
+
+    Each chunk is sorted once; every masked variant of every frame's chunk is then
+    looked up with searchsorted, so candidate generation stays in NumPy.
+    """
+    frame_index = np.arange(len(frames))
+    found_a, found_b = [], []
+
+    for chunk_no in range(MIH_CHUNKS):
+        chunk = ((frames >> np.uint64(16 * chunk_no)) & np.uint64(0xFFFF)).astype(np.int64)
+        order = np.argsort(chunk, kind='stable')
+        sorted_chunk = chunk[order]
+
+        for mask in _MIH_MASKS[radius]:
+            wanted = chunk ^ mask
+            lo = np.searchsorted(sorted_chunk, wanted, side='left')
+            hits = np.searchsorted(sorted_chunk, wanted, side='right') - lo
+            total = int(hits.sum())
+            if not total:
+                continue
+
+            # Expand each frame's [lo, lo + hits) range of sorted positions
+            a = np.repeat(frame_index, hits)
+            run_starts = np.repeat(np.cumsum(hits) - hits, hits)
+            b = order[np.repeat(lo, hits) + (np.arange(total) - run_starts)]
+
+            keep = owners[a] < owners[b]
+            found_a.append(a[keep])
+            found_b.append(b[keep])
+
+    if not found_a:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(found_a), np.concatenate(found_b)
+
 
 class FingerprintService:
     """Generate and compare video fingerprints using perceptual hashing"""
@@ -239,9 +323,9 @@ class FingerprintService:
             Hamming distance (0 = identical, higher = more different)
         """
         try:
-            h1 = imagehash.hex_to_hash(hash1)
-            h2 = imagehash.hex_to_hash(hash2)
-            return h1 - h2  # Returns Hamming distance
+            if len(hash1) != len(hash2):
+                raise ValueError(f"hash lengths differ ({len(hash1)} vs {len(hash2)})")
+            return (int(hash1, 16) ^ int(hash2, 16)).bit_count()
         except Exception as e:
             logger.error(f"Error calculating hamming distance: {e}")
             return 999  # Return high value on error
@@ -279,6 +363,151 @@ class FingerprintService:
         # 64 bits total, each bit difference = 1.5625% less similar
         return max(0, 100 - (hamming_distance * 1.5625))
 
+    def similarity_percent_array(self, hamming_distances: np.ndarray) -> np.ndarray:
+        """
+        Vectorized similarity_percent for an array of Hamming distances
+
+        Args:
+            hamming_distances: Array of Hamming distances
+
+        Returns:
+            float64 array of similarity percentages (0-100)
+        """
+        distances = np.asarray(hamming_distances, dtype=np.float64)
+        return np.maximum(0, 100 - distances * 1.5625)
+
+    def group_similar_videos(self, video_ids: List[int], video_scores: Dict[Tuple[int, int], int]) -> List[List[int]]:
+        """
+        Group videos connected through similar pairs (transitively)
+
+        Video ids are remapped to dense indices and the pairs become a sparse
+        adjacency matrix, labelled by SciPy's connected_components (C code)
+        instead of a Python union-find.
+
+        Args:
+            video_ids: Candidate videos; groups list members in this order
+            video_scores: Similar pairs as returned by find_similar_video_pairs
+
+        Returns:
+            Groups of 2+ video ids, ordered by their first member's position in video_ids
+        """
+        if not video_scores:
+            return []
+
+        pair_ids = np.array(list(video_scores.keys()), dtype=np.int64)
+        paired_ids, edges = np.unique(pair_ids, return_inverse=True)
+        edges = edges.reshape(-1, 2)
+        adjacency = csr_matrix(
+            (np.ones(len(edges), dtype=np.int8), (edges[:, 0], edges[:, 1])),
+            shape=(len(paired_ids), len(paired_ids))
+        )
+        _, labels = connected_components(adjacency, directed=False)
+        label_by_id = dict(zip(paired_ids.tolist(), labels.tolist()))
+
+        groups = {}
+        for video_id in video_ids:
+            label = label_by_id.get(video_id)
+            if label is not None:
+                groups.setdefault(label, []).append(video_id)
+
+        return [group for group in groups.values() if len(group) >= 2]
+
+    def closest_video_distances(self, query_hashes: List[int], video_ids: List[int], hashes: List[int]) -> Dict[int, int]:
+        """
+        Closest distance between any query frame and each library video's frames
+
+        All query x library frame distances come from one broadcast XOR +
+        popcount; the per-video minimum is then a reduceat over the rows.
+
+        Args:
+            query_hashes: Frame hashes of the video being checked (phash_int format)
+            video_ids: Owning video_id per library row, rows grouped by video_id
+            hashes: Library frame hashes (phash_int format), aligned with video_ids
+
+        Returns:
+            {video_id: min_distance} for every library video
+        """
+        query = int64_hashes_to_uint64(query_hashes)
+        if not len(query) or not video_ids:
+            return {}
+
+        library = np.array(hashes, dtype=np.int64).view(np.uint64)
+        owners = np.array(video_ids)
+
+        frame_min = popcount64(query[:, None] ^ library[None, :]).min(axis=0)
+        starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+        per_video = np.minimum.reduceat(frame_min, starts)
+
+        return dict(zip(owners[starts].tolist(), per_video.tolist()))
+
+    def find_similar_video_pairs(self, video_hashes: Dict[int, List[int]], threshold: int) -> Dict[Tuple[int, int], int]:
+        """
+        Find all video pairs whose closest frames are within threshold
+
+        For thresholds up to 4 * MIH_MAX_CHUNK_RADIUS + 3 (default 10 included),
+        candidate frame pairs come from a multi-index hash over 16-bit chunks and
+        only those are measured - near-linear instead of all frame pairs. Larger
+        thresholds fall back to a full NumPy scan (XOR + popcount) of each video
+        against every later video.
+
+        Args:
+            video_hashes: video_id -> list of frame hashes as stored in phash_int
+            threshold: Maximum Hamming distance to consider similar
+
+        Returns:
+            {(smaller_video_id, larger_video_id): min_distance} for similar pairs
+        """
+        video_ids = []
+        frame_arrays = []
+        for video_id, hashes in video_hashes.items():
+            frames = int64_hashes_to_uint64(hashes)
+            if len(frames):
+                video_ids.append(video_id)
+                frame_arrays.append(frames)
+
+        if len(video_ids) < 2 or threshold < 0:
+            return {}
+
+        # All frames in one array; each video owns a contiguous slice
+        counts = np.array([len(frames) for frames in frame_arrays])
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        all_frames = np.concatenate(frame_arrays)
+
+        pairs = {}
+
+        if threshold // MIH_CHUNKS <= MIH_MAX_CHUNK_RADIUS:
+            owners = np.repeat(np.arange(len(video_ids)), counts)
+            a, b = _mih_candidate_pairs(all_frames, owners, threshold // MIH_CHUNKS)
+            distances = popcount64(all_frames[a] ^ all_frames[b])
+            close = distances <= threshold
+            if not close.any():
+                return pairs
+            owner_a, owner_b, distances = owners[a][close], owners[b][close], distances[close]
+
+            # Min distance per video pair: sort by pair, then reduce each run
+            pair_codes = owner_a * len(video_ids) + owner_b
+            order = np.lexsort((distances, pair_codes))
+            pair_codes, distances = pair_codes[order], distances[order]
+            first = np.flatnonzero(np.r_[True, pair_codes[1:] != pair_codes[:-1]])
+
+            for code, distance in zip(pair_codes[first].tolist(), distances[first].tolist()):
+                id_a, id_b = video_ids[code // len(video_ids)], video_ids[code % len(video_ids)]
+                pairs[(min(id_a, id_b), max(id_a, id_b))] = distance
+            return pairs
+
+        for i in range(len(video_ids) - 1):
+            rest_start = starts[i + 1]
+            distances = popcount64(frame_arrays[i][:, None] ^ all_frames[None, rest_start:])
+            # Min over this video's frames, then over each later video's slice
+            per_video = np.minimum.reduceat(distances.min(axis=0), starts[i + 1:] - rest_start)
+
+            for offset in np.flatnonzero(per_video <= threshold):
+                other_id = video_ids[i + 1 + offset]
+                pair_key = (min(video_ids[i], other_id), max(video_ids[i], other_id))
+                pairs[pair_key] = int(per_video[offset])
+
+        return pairs
+
     async def extract_frame_image(self, video_path: str, position: float) -> Optional[str]:
         """
         Extract single frame at position and return as base64 encoded JPEG thumbnail
@@ -315,7 +544,6 @@ class FingerprintService:
 
         try:
             # Read image and convert to base64
-            import base64
             with open(frame_path, 'rb') as f:
                 image_data = f.read()
 
@@ -332,6 +560,101 @@ class FingerprintService:
             except:
                 pass
 
+    async def extract_frame_images(self, video_path: str, positions: List[float]) -> List[Optional[str]]:
+        """
+        Extract frames at several positions with a single ffmpeg process
+
+        Each position becomes its own fast-seeked input (-ss before -i) mapped to
+        its own output file, so N thumbnails cost one duration probe and one
+        process launch instead of N of each.
+
+        Args:
+            video_path: Path to video file
+            positions: Positions in video (0.0 to 1.0, percentage)
+
+        Returns:
+            Base64 encoded JPEG image strings in the order of positions (None for failed frames)
+        """
+        frames: List[Optional[str]] = [None] * len(positions)
+        if not positions:
+            return frames
+
+        if not self.ffmpeg_available:
+            logger.error("FFmpeg not available")
+            return frames
+
+        if not Path(video_path).exists():
+            logger.error(f"Video file not found: {video_path}")
+            return frames
+
+        duration = await self._get_duration(video_path)
+        if not duration or duration <= 0:
+            logger.error(f"Could not get duration for: {video_path}")
+            return frames
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cmd = ['ffmpeg', '-loglevel', 'error', '-y']
+            for position in positions:
+                cmd += ['-ss', str(duration * position), '-i', str(video_path)]
+
+            frame_paths = [Path(temp_dir) / f"frame_{i}.jpg" for i in range(len(positions))]
+            for i, frame_path in enumerate(frame_paths):
+                cmd += [
+                    '-map', f'{i}:v:0',
+                    '-frames:v', '1',
+                    '-vf', 'scale=320:-1',
+                    '-q:v', '2',
+                    str(frame_path)
+                ]
+
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    await asyncio.wait_for(process.communicate(), timeout=15 + 5 * len(positions))
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    logger.error(f"Frame extraction timeout for {Path(video_path).name}")
+                    return frames
+            except Exception as e:
+                logger.error(f"Error extracting frames: {e}")
+                return frames
+
+            # A position past the end only loses its own frame; keep whatever was written
+            for i, frame_path in enumerate(frame_paths):
+                try:
+                    image_data = frame_path.read_bytes()
+                except OSError:
+                    logger.error(f"Failed to extract frame at {positions[i]*100}%")
+                    continue
+                if image_data:
+                    frames[i] = f"data:image/jpeg;base64,{base64.b64encode(image_data).decode('utf-8')}"
+
+        return frames
+
+    def generate_fingerprint_from_image_bytes(self, image_bytes: bytes) -> Optional[str]:
+        """
+        Generate pHash fingerprint for an encoded image (JPEG/PNG/...)
+
+        CPU-bound (decode + DCT) - call via asyncio.to_thread from async code.
+
+        Args:
+            image_bytes: Encoded image data
+
+        Returns:
+            Hex string of pHash, or None if failed
+        """
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                return str(imagehash.phash(img, hash_size=self.hash_size))
+        except Exception as e:
+            logger.error(f"Failed to generate pHash from image data: {e}")
+            return None
+
     async def generate_single_frame_fingerprint(self, video_path: str, position: float) -> Optional[str]:
         """
         Generate pHash fingerprint for a single frame at specified position
@@ -381,3 +704,7 @@ class FingerprintService:
                 os.unlink(frame_path)
             except:
                 pass
+
+
+# Global singleton instance (the ffmpeg availability check runs once, at import)
+fingerprint_service = FingerprintService()
@@ -10,7 +10,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from config import config
@@ -92,7 +92,8 @@ app = FastAPI(
     title="Clipper API",
     version="0.1.0",
     lifespan=lifespan,
-    description="Video/media file manager API"
+    description="Video/media file manager API",
+    default_response_class=ORJSONResponse  # orjson: much cheaper encoding of large list responses
 )
 
 # Frontend path for static file serving
@@ -17,6 +17,59 @@ from typing import Dict, Optional
 logger = logging.getLogger(__name__)
 
 
+# Patterns are compiled once at import and tried in order.
+# Separators are a single [_\s-]* run rather than \s*[_\s-]*: it matches the same
+# text but gives the engine far fewer ways to split a run of separators, which
+# is where non-matching long names spent their time.
+
+# Pattern 1: Standard format with SxxExx
+# Examples: "Breaking Bad S01E01 2008 AMC", "Show_Name_S02E05_2023_HBO"
+_PATTERN_1 = re.compile(
+    r'^(?P<series>.*?)[_\s-]*S(?P<season>\d+)E(?P<episode>\d+)[_\s-]*(?P<year>\d{4})?[_\s-]*(?P<channel>[\w\s]+)?$',
+    re.IGNORECASE
+)
+
+# Pattern 2: Format with brackets for channel
+# Example: "[HBO] Show Name - S01E01 - 2023"
+_PATTERN_2 = re.compile(
+    r'^\[(?P<channel>[^\]]+)\]\s*(?P<series>.*?)[_\s-]*S(?P<season>\d+)E(?P<episode>\d+)[_\s-]*(?P<year>\d{4})?',
+    re.IGNORECASE
+)
+
+# Pattern 3: Format with parentheses for year
+# Example: "Show Name - Episode 1 (2023) [HBO]"
+_PATTERN_3 = re.compile(
+    r'^(?P<series>.*?)[_\s-]*(?:Episode|Ep|E)?\s*(?P<episode>\d+)\s*\((?P<year>\d{4})\)\s*(?:\[(?P<channel>[^\]]+)\])?',
+    re.IGNORECASE
+)
+
+# Pattern 4: Dot-separated format
+# Example: "2023.Show.Name.S01E01.HBO"
+_PATTERN_4 = re.compile(
+    r'^(?P<year>\d{4})\.(?P<series>.*?)\.S(?P<season>\d+)E(?P<episode>\d+)(?:\.(?P<channel>[\w]+))?$',
+    re.IGNORECASE
+)
+
+# Pattern 5: Simple movie format with year
+# Example: "Movie Name (2023)", "Movie Name 2023"
+_PATTERN_5 = re.compile(
+    r'^(?P<series>.*?)\s*[\(\[]*(?P<year>\d{4})[\)\]]*(?:\s*[\[\(](?P<channel>[^\]\)]+)[\]\)])?$',
+    re.IGNORECASE
+)
+
+# Pattern 6: Episode without season
+# Example: "Show Name E01 2023 HBO"
+_PATTERN_6 = re.compile(
+    r'^(?P<series>.*?)[_\s-]*E(?P<episode>\d+)[_\s-]*(?P<year>\d{4})?[_\s-]*(?P<channel>[\w\s]+)?$',
+    re.IGNORECASE
+)
+
+_FILENAME_PATTERNS = (_PATTERN_1, _PATTERN_2, _PATTERN_3, _PATTERN_4, _PATTERN_5, _PATTERN_6)
+
+# Fallback when no pattern matches: a bare 4-digit year
+_YEAR_PATTERN = re.compile(r'[\(\[]?(\d{4})[\)\]]?')
+
+
 def parse_metadata_from_filename(filename: str) -> Dict[str, Optional[any]]:
     """
     Parse metadata from video filename using multiple regex patterns.
@@ -39,52 +92,7 @@ def parse_metadata_from_filename(filename: str) -> Dict[str, Optional[any]]:
         'channel': None
     }
 
-    # Pattern 1: Standard format with SxxExx
-    # Examples: "Breaking Bad S01E01 2008 AMC", "Show_Name_S02E05_2023_HBO"
-    pattern1 = re.compile(
-        r'^(?P<series>.*?)\s*[_\s-]*S(?P<season>\d+)E(?P<episode>\d+)\s*[_\s-]*(?P<year>\d{4})?\s*[_\s-]*(?P<channel>[\w\s]+)?$',
-        re.IGNORECASE
-    )
-
-    # Pattern 2: Format with brackets for channel
-    # Example: "[HBO] Show Name - S01E01 - 2023"
-    pattern2 = re.compile(
-        r'^\[(?P<channel>[^\]]+)\]\s*(?P<series>.*?)\s*[_\s-]*S(?P<season>\d+)E(?P<episode>\d+)\s*[_\s-]*(?P<year>\d{4})?',
-        re.IGNORECASE
-    )
-
-    # Pattern 3: Format with parentheses for year
-    # Example: "Show Name - Episode 1 (2023) [HBO]"
-    pattern3 = re.compile(
-        r'^(?P<series>.*?)\s*[_\s-]*(?:Episode|Ep|E)?\s*(?P<episode>\d+)\s*\((?P<year>\d{4})\)\s*(?:\[(?P<channel>[^\]]+)\])?',
-        re.IGNORECASE
-    )
-
-    # Pattern 4: Dot-separated format
-    # Example: "2023.Show.Name.S01E01.HBO"
-    pattern4 = re.compile(
-        r'^(?P<year>\d{4})\.(?P<series>.*?)\.S(?P<season>\d+)E(?P<episode>\d+)(?:\.(?P<channel>[\w]+))?$',
-        re.IGNORECASE
-    )
-
-    # Pattern 5: Simple movie format with year
-    # Example: "Movie Name (2023)", "Movie Name 2023"
-    pattern5 = re.compile(
-        r'^(?P<series>.*?)\s*[\(\[]*(?P<year>\d{4})[\)\]]*(?:\s*[\[\(](?P<channel>[^\]\)]+)[\]\)])?$',
-        re.IGNORECASE
-    )
-
-    # Pattern 6: Episode without season
-    # Example: "Show Name E01 2023 HBO"
-    pattern6 = re.compile(
-        r'^(?P<series>.*?)\s*[_\s-]*E(?P<episode>\d+)\s*[_\s-]*(?P<year>\d{4})?\s*[_\s-]*(?P<channel>[\w\s]+)?$',
-        re.IGNORECASE
-    )
-
-    # Try each pattern
-    patterns = [pattern1, pattern2, pattern3, pattern4, pattern5, pattern6]
-
-    for pattern in patterns:
+    for pattern in _FILENAME_PATTERNS:
         match = pattern.match(name)
         if match:
             groups = match.groupdict()
@@ -137,7 +145,7 @@ def parse_metadata_from_filename(filename: str) -> Dict[str, Optional[any]]:
                 return metadata
 
     # If no pattern matched, try to extract just the year
-    year_match = re.search(r'[\(\[]?(\d{4})[\)\]]?', name)
+    year_match = _YEAR_PATTERN.search(name)
     if year_match:
         try:
             year = int(year_match.group(1))
@@ -1,20 +1,73 @@
 """Actor management endpoints."""
 
+import base64
+import json
 import logging
 import time
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func, desc
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select, func, desc, tuple_, literal
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, Actor, Video
+from database import get_db, get_data_version, Actor, Video, video_actors
 from schemas.actor import AddActorRequest, UpdateActorRequest
+from utils.versioned_cache import VersionedCache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/actors", tags=["actors"])
 
+# Sort column per sort_by value, paired with whether it is descending
+ACTOR_SORT_COLUMNS = {
+    "name": (Actor.name, False),
+    "video_count": (Actor.video_count, True),
+    "created_at": (Actor.created_at, True),
+}
+
+# Offset-based actor pages keyed by (limit, offset, sort_by) -> (rows, next cursor);
+# any commit invalidates them
+_actors_cache = VersionedCache()
+
+
+def _encode_cursor(sort_value, actor_id: int) -> str:
+    """Encode the last (sort value, id) of a page as an opaque cursor."""
+    raw = json.dumps([sort_value, actor_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by _encode_cursor into (sort value, id)."""
+    try:
+        sort_value, actor_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return sort_value, int(actor_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _get_or_create_actor(db: AsyncSession, actor_name: str, notes: str | None = None) -> Actor:
+    """Insert an actor in one statement, or load the existing one on a name conflict.
+
+    The unique lower(name) index makes the conflict case-insensitive. The
+    caller is responsible for committing.
+    """
+    result = await db.execute(
+        insert(Actor)
+        .values(name=actor_name, notes=notes, video_count=0, created_at=time.time())
+        .on_conflict_do_nothing()
+        .returning(Actor)
+    )
+    actor = result.scalar_one_or_none()
+
+    if actor is None:
+        result = await db.execute(
+            select(Actor).where(func.lower(Actor.name) == actor_name.lower())
+        )
+        actor = result.scalar_one()
+
+    return actor
+
 
 @router.get("/search")
 async def search_actors(
@@ -46,25 +99,53 @@ async def search_actors(
 
 @router.get("")
 async def get_all_actors(
+    response: Response,
     limit: int = 100,
     offset: int = 0,
     sort_by: str = "name",
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all actors with their video counts."""
-    if sort_by == "video_count":
-        stmt = select(Actor).order_by(desc(Actor.video_count))
-    elif sort_by == "created_at":
-        stmt = select(Actor).order_by(desc(Actor.created_at))
-    else:  # Default to name
-        stmt = select(Actor).order_by(Actor.name)
+    """Get all actors with their video counts.
+
+    Pages are ordered by (sort column, id). Pass the X-Next-Cursor header of
+    the previous page as `cursor` to seek straight to the next page instead
+    of scanning past `offset` rows.
+    """
+    version = get_data_version()
+    cache_key = (limit, offset, sort_by)
+    if not cursor:
+        cached = _actors_cache.get(version, cache_key)
+        if cached is not None:
+            rows, next_cursor = cached
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return rows
+
+    sort_column, descending = ACTOR_SORT_COLUMNS.get(sort_by, ACTOR_SORT_COLUMNS["name"])
+
+    if descending:
+        stmt = select(Actor).order_by(desc(sort_column), desc(Actor.id))
+    else:
+        stmt = select(Actor).order_by(sort_column, Actor.id)
 
-    stmt = stmt.limit(limit).offset(offset)
+    if cursor:
+        last_value, last_id = _decode_cursor(cursor)
+        position = tuple_(sort_column, Actor.id)
+        stmt = stmt.where(position < (last_value, last_id) if descending else position > (last_value, last_id))
+    else:
+        stmt = stmt.offset(offset)
 
-    result = await db.execute(stmt)
+    result = await db.execute(stmt.limit(limit))
     actors = result.scalars().all()
 
-    return [{
+    next_cursor = None
+    if actors and len(actors) == limit:
+        last = actors[-1]
+        next_cursor = _encode_cursor(getattr(last, sort_column.key), last.id)
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    rows = [{
         "id": actor.id,
         "name": actor.name,
         "notes": actor.notes,
@@ -72,6 +153,11 @@ async def get_all_actors(
         "created_at": actor.created_at
     } for actor in actors]
 
+    if not cursor:
+        _actors_cache.set(version, (rows, next_cursor), cache_key)
+
+    return rows
+
 
 @router.post("")
 async def create_actor(
@@ -93,40 +179,15 @@ async def create_actor(
     # Convert to title case for consistency
     actor_name = actor_name.title()
 
-    # Check if actor already exists (case-insensitive)
-    result = await db.execute(
-        select(Actor).where(func.lower(Actor.name) == func.lower(actor_name))
-    )
-    existing_actor = result.scalar_one_or_none()
-
-    if existing_actor:
-        # Return existing actor
-        return {
-            "id": existing_actor.id,
-            "name": existing_actor.name,
-            "notes": existing_actor.notes,
-            "video_count": existing_actor.video_count,
-            "created_at": existing_actor.created_at
-        }
-
-    # Create new actor
-    new_actor = Actor(
-        name=actor_name,
-        notes=body.get('notes', ''),
-        video_count=0,
-        created_at=time.time()
-    )
-
-    db.add(new_actor)
+    actor = await _get_or_create_actor(db, actor_name, body.get('notes', ''))
     await db.commit()
-    await db.refresh(new_actor)
 
     return {
-        "id": new_actor.id,
-        "name": new_actor.name,
-        "notes": new_actor.notes,
-        "video_count": new_actor.video_count,
-        "created_at": new_actor.created_at
+        "id": actor.id,
+        "name": actor.name,
+        "notes": actor.notes,
+        "video_count": actor.video_count,
+        "created_at": actor.created_at
     }
 
 
@@ -147,43 +208,31 @@ async def add_actor_to_video(
     # Convert to title case for consistency
     actor_name = actor_name.title()
 
-    # Get video with actors
-    result = await db.execute(
-        select(Video).options(selectinload(Video.actors)).where(Video.id == video_id)
-    )
-    video = result.scalar_one_or_none()
-
-    if not video:
+    # Only existence matters here - no need to load the video or its actors
+    result = await db.execute(select(Video.id).where(Video.id == video_id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    # Check if actor already exists (case-insensitive)
-    actor_result = await db.execute(
-        select(Actor).where(func.lower(Actor.name) == actor_name.lower())
-    )
-    actor = actor_result.scalar_one_or_none()
+    # Get or create the actor (case-insensitive)
+    actor = await _get_or_create_actor(db, actor_name)
 
-    # Create actor if doesn't exist
-    if not actor:
-        actor = Actor(
-            name=actor_name,
-            video_count=0,
-            created_at=time.time()
+    # Insert the association unless it already exists, in one statement
+    # (actors.video_count is maintained by a database trigger)
+    already_assigned = (
+        select(video_actors.c.id)
+        .where(video_actors.c.video_id == video_id, video_actors.c.actor_id == actor.id)
+        .exists()
+    )
+    result = await db.execute(
+        insert(video_actors).from_select(
+            ["video_id", "actor_id", "created_at"],
+            select(literal(video_id), literal(actor.id), literal(time.time())).where(~already_assigned)
         )
-        db.add(actor)
-        await db.flush()  # Get the actor ID
-
-    # Check if already assigned
-    if actor in video.actors:
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=400, detail="Actor already assigned to this video")
 
-    # Add actor to video
-    video.actors.append(actor)
-
-    # Update actor video count
-    actor.video_count += 1
-
     await db.commit()
-    await db.refresh(actor)
 
     return {
         "message": "Actor added successfully",
@@ -220,7 +269,6 @@ async def remove_actor_from_video(
     # Remove actor from video
     if actor in video.actors:
         video.actors.remove(actor)
-        actor.video_count -= 1
         await db.commit()
 
         return {
@@ -287,7 +335,6 @@ async def update_actor(
         actor.notes = body.notes
 
     await db.commit()
-    await db.refresh(actor)
 
     return {
         "message": "Actor updated successfully",
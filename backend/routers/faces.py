@@ -1,27 +1,142 @@
 """Face recognition and management endpoints."""
 
+import asyncio
+import base64
 import logging
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
+import cv2
 import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Body
-from sqlalchemy import select, and_, func
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy import select, and_, or_, exists, func, true, update, delete as sql_delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
-from sklearn.metrics.pairwise import cosine_similarity
+from sqlalchemy.orm import contains_eager
 
-from database import get_db, Video, FaceID, FaceEncoding, VideoFace, Actor
+from database import get_db, get_data_version, Video, FaceID, FaceEncoding, VideoFace, Actor, id_in
 from face_service import face_service
 from schemas.face import CompareFacesRequest, LinkFaceToVideoRequest, MergeFacesRequest
+from utils.versioned_cache import VersionedCache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/faces", tags=["faces"])
 
 
+# Everything about an encoding except the embedding itself (see _face_encoding_bytes)
+_ENCODING_SUMMARY_COLUMNS = (
+    FaceEncoding.id,
+    FaceEncoding.video_id,
+    FaceEncoding.frame_timestamp,
+    FaceEncoding.thumbnail,
+    FaceEncoding.confidence,
+    FaceEncoding.quality_score,
+    FaceEncoding.created_at,
+)
+
+# face_id -> {encoding_id: embedding bytes}; dropped on the next committed write.
+# Up to ~400 KB per face (200 x 2 KB), so LRU-bounded to ~50 MB worst case
+_encoding_bytes_cache = VersionedCache(max_entries=128)
+
+# face_id -> serialized /{face_id}/encodings body. One body carries up to 200
+# thumbnails plus base64 embeddings (several MB), so bound the summed body size
+_face_encodings_response_cache = VersionedCache(max_bytes=32 * 1024 * 1024)
+
+# /stats counts; any commit invalidates them
+_face_stats_cache = VersionedCache()
+
+
+async def _face_encoding_bytes(db: AsyncSession, face_id: int) -> Dict[int, bytes]:
+    """
+    Raw float32 embeddings of a face's encodings, keyed by encoding id.
+
+    Repeat analysis/cleanup requests reuse the loaded bytes instead of reading
+    every embedding again.
+    """
+    version = get_data_version()
+    cached = _encoding_bytes_cache.get(version, face_id)
+    if cached is not None:
+        return cached
+
+    result = await db.stream(
+        select(FaceEncoding.id, FaceEncoding.encoding)
+        .where(FaceEncoding.face_id == face_id)
+        .execution_options(yield_per=500)
+    )
+    encodings = {}
+    async for partition in result.partitions():
+        encodings.update(partition)
+
+    _encoding_bytes_cache.set(version, encodings, face_id)
+    return encodings
+
+
+def _video_counts_subquery():
+    """Videos per face, aggregated once over video_faces before joining to face_ids."""
+    return (
+        select(VideoFace.face_id, func.count().label('video_count'))
+        .group_by(VideoFace.face_id)
+        .subquery()
+    )
+
+
+async def _best_encodings(db: AsyncSession, face_ids: List[int], *columns) -> Dict[int, Any]:
+    """Highest-quality encoding per face in one ROW_NUMBER() query, as {face_id: row of columns}."""
+    if not face_ids:
+        return {}
+    ranked = (
+        select(
+            FaceEncoding.id,
+            func.row_number().over(
+                partition_by=FaceEncoding.face_id,
+                order_by=(FaceEncoding.quality_score.desc(), FaceEncoding.id)
+            ).label('rank')
+        )
+        .where(id_in(FaceEncoding.face_id, face_ids))
+        .subquery()
+    )
+    result = await db.stream(
+        select(FaceEncoding.face_id, *columns)
+        .join(ranked, FaceEncoding.id == ranked.c.id)
+        .where(ranked.c.rank == 1)
+        .execution_options(yield_per=500)
+    )
+    return {row.face_id: row async for row in result}
+
+
+async def _representative_encodings(db: AsyncSession, faces: List[FaceID]) -> Dict[int, Any]:
+    """
+    Encoding used to compare each face: its primary encoding if that has data,
+    otherwise its best-quality one. Two queries for any number of faces.
+
+    Returns {face_id: row(id, encoding, thumbnail)}; faces with no usable encoding are absent.
+    """
+    columns = (FaceEncoding.id, FaceEncoding.encoding, FaceEncoding.thumbnail)
+
+    primary_ids = [face.primary_encoding_id for face in faces if face.primary_encoding_id]
+    primaries = {}
+    if primary_ids:
+        primary_result = await db.stream(
+            select(*columns)
+            .where(id_in(FaceEncoding.id, primary_ids))
+            .execution_options(yield_per=500)
+        )
+        primaries = {row.id: row async for row in primary_result}
+
+    encodings = {}
+    for face in faces:
+        primary = primaries.get(face.primary_encoding_id)
+        if primary is not None and primary.encoding:
+            encodings[face.id] = primary
+
+    fallback = await _best_encodings(db, [face.id for face in faces if face.id not in encodings], *columns)
+    encodings.update((face_id, row) for face_id, row in fallback.items() if row.encoding)
+    return encodings
+
+
 # ==================== FACE SEARCH & CREATION ====================
 
 @router.post("/search")
@@ -42,8 +157,6 @@ async def search_face(
     Args:
         exclude_face_id: Optional face ID to exclude from results (e.g., when finding duplicates)
     """
-    import cv2
-
     try:
         image_bytes = await face_image.read()
         nparr = np.frombuffer(image_bytes, np.uint8)
@@ -105,14 +218,17 @@ async def search_faces_by_name(
     - limit: Maximum results
     """
     try:
-        stmt = select(FaceID).options(joinedload(FaceID.actor))
+        # One explicit outer join serves both the actor-name filter and the
+        # eager load (filtering on Actor without it cross-joined every actor)
+        stmt = (
+            select(FaceID)
+            .outerjoin(Actor, FaceID.actor_id == Actor.id)
+            .options(contains_eager(FaceID.actor))
+        )
 
         filters = []
         if q.strip():
-            filters.append(
-                (func.lower(FaceID.name).contains(q.lower())) |
-                (func.lower(Actor.name).contains(q.lower()))
-            )
+            filters.append(FaceID.name.icontains(q) | Actor.name.icontains(q))
 
         if actor_id is not None:
             filters.append(FaceID.actor_id == actor_id)
@@ -284,6 +400,11 @@ async def delete_encoding_from_face(face_id: int, encoding_id: int, db: AsyncSes
 async def get_face_encodings(face_id: int, db: AsyncSession = Depends(get_db)):
     """Get all encodings for a specific face with video information."""
     try:
+        version = get_data_version()
+        cached = _face_encodings_response_cache.get(version, face_id)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
         face_result = await db.execute(
             select(FaceID).where(FaceID.id == face_id)
         )
@@ -294,35 +415,36 @@ async def get_face_encodings(face_id: int, db: AsyncSession = Depends(get_db)):
             raise HTTPException(status_code=404, detail=f"Face {face_id} not found")
 
         encodings_result = await db.execute(
-            select(FaceEncoding, Video.name)
+            select(*_ENCODING_SUMMARY_COLUMNS, FaceEncoding.encoding, Video.name)
             .outerjoin(Video, FaceEncoding.video_id == Video.id)
             .where(FaceEncoding.face_id == face_id)
             .order_by(FaceEncoding.quality_score.desc())
         )
-        encodings_data = encodings_result.all()
 
         encoding_list = []
-        for enc, video_name in encodings_data:
+        for enc in encodings_result.all():
             encoding_list.append({
                 "id": enc.id,
                 "video_id": enc.video_id,
-                "video_name": video_name or "Unknown Video",
-                "frame_timestamp": float(enc.frame_timestamp) if enc.frame_timestamp else None,
+                "video_name": enc.name or "Unknown Video",
+                "frame_timestamp": enc.frame_timestamp or None,
                 "thumbnail": enc.thumbnail or "",
-                "confidence": float(enc.confidence) if enc.confidence else 0.0,
-                "quality_score": float(enc.quality_score) if enc.quality_score else 0.0,
-                "created_at": enc.created_at.isoformat() if enc.created_at and hasattr(enc.created_at, 'isoformat') else str(enc.created_at) if enc.created_at else None,
-                "embedding": enc.encoding or ""
+                "confidence": enc.confidence or 0.0,
+                "quality_score": enc.quality_score or 0.0,
+                "created_at": str(enc.created_at) if enc.created_at else None,
+                "embedding": base64.b64encode(enc.encoding).decode('utf-8') if enc.encoding else ""
             })
 
         logger.info(f"Retrieved {len(encoding_list)} encodings for face {face_id}")
 
-        return {
+        response = ORJSONResponse({
             "face_id": face_id,
             "face_name": face.name,
             "total_encodings": len(encoding_list),
             "embeddings": encoding_list
-        }
+        })
+        _face_encodings_response_cache.set(version, response.body, face_id)
+        return response
 
     except HTTPException:
         raise
@@ -358,45 +480,62 @@ async def get_cleanup_encodings(face_id: int, threshold: float = 0.3, db: AsyncS
 
         if face.primary_encoding_id:
             primary_result = await db.execute(
-                select(FaceEncoding).where(FaceEncoding.id == face.primary_encoding_id)
+                select(FaceEncoding.id, FaceEncoding.encoding).where(FaceEncoding.id == face.primary_encoding_id)
             )
-            primary_encoding = primary_result.scalar_one_or_none()
+            primary_encoding = primary_result.first()
 
         if not primary_encoding or not primary_encoding.encoding:
             best_result = await db.execute(
-                select(FaceEncoding)
+                select(FaceEncoding.id, FaceEncoding.encoding)
                 .where(FaceEncoding.face_id == face_id)
                 .order_by(FaceEncoding.quality_score.desc())
                 .limit(1)
             )
-            primary_encoding = best_result.scalar_one_or_none()
+            primary_encoding = best_result.first()
             primary_is_fallback = True
 
         if not primary_encoding or not primary_encoding.encoding:
             raise HTTPException(status_code=400, detail="Face has no valid encodings")
 
-        primary_vector = face_service.base64_to_encoding(primary_encoding.encoding)
+        primary_vector = face_service.bytes_to_encoding(primary_encoding.encoding)
 
         encodings_result = await db.execute(
-            select(FaceEncoding, Video.name)
+            select(*_ENCODING_SUMMARY_COLUMNS, Video.name)
             .outerjoin(Video, FaceEncoding.video_id == Video.id)
             .where(FaceEncoding.face_id == face_id)
             .order_by(FaceEncoding.quality_score.desc())
         )
-        encodings_data = encodings_result.all()
+        encodings_data = [(row, row.name) for row in encodings_result.all()]
+        encoding_bytes_by_id = await _face_encoding_bytes(db, face_id)
+
+        # Score every other encoding against the primary with one float32 mat-vec;
+        # empty or mismatched encodings score 0
+        candidate_ids = []
+        candidate_bytes = []
+        for enc, _ in encodings_data:
+            encoding_bytes = encoding_bytes_by_id.get(enc.id)
+            if enc.id == primary_encoding.id or not encoding_bytes:
+                continue
+            if len(encoding_bytes) != primary_vector.nbytes:
+                logger.warning(
+                    f"Error calculating similarity for encoding {enc.id}: "
+                    f"size {len(encoding_bytes)} bytes, primary is {primary_vector.nbytes}"
+                )
+                continue
+            candidate_ids.append(enc.id)
+            candidate_bytes.append(encoding_bytes)
+
+        similarities = {}
+        if candidate_bytes:
+            others = face_service.bytes_to_encodings(candidate_bytes)
+            scores = (others @ primary_vector) / (np.linalg.norm(others, axis=1) * np.linalg.norm(primary_vector))
+            similarities = dict(zip(candidate_ids, scores.tolist()))
 
         scored_list = []
         for enc, video_name in encodings_data:
             is_primary = (enc.id == primary_encoding.id)
 
-            similarity = 1.0 if is_primary else 0.0
-            if not is_primary and enc.encoding:
-                try:
-                    enc_vector = face_service.base64_to_encoding(enc.encoding)
-                    similarity = face_service.calculate_similarity(primary_vector, enc_vector)
-                except Exception as e:
-                    logger.warning(f"Error calculating similarity for encoding {enc.id}: {e}")
-                    similarity = 0.0
+            similarity = 1.0 if is_primary else similarities.get(enc.id, 0.0)
 
             if is_primary:
                 quality_level = "primary"
@@ -411,11 +550,11 @@ async def get_cleanup_encodings(face_id: int, threshold: float = 0.3, db: AsyncS
                 "id": enc.id,
                 "video_id": enc.video_id,
                 "video_name": video_name or "Unknown Video",
-                "frame_timestamp": float(enc.frame_timestamp) if enc.frame_timestamp else None,
+                "frame_timestamp": enc.frame_timestamp or None,
                 "thumbnail": enc.thumbnail or "",
-                "confidence": float(enc.confidence) if enc.confidence else 0.0,
-                "quality_score": float(enc.quality_score) if enc.quality_score else 0.0,
-                "created_at": enc.created_at.isoformat() if enc.created_at and hasattr(enc.created_at, 'isoformat') else str(enc.created_at) if enc.created_at else None,
+                "confidence": enc.confidence or 0.0,
+                "quality_score": enc.quality_score or 0.0,
+                "created_at": str(enc.created_at) if enc.created_at else None,
                 "vector_similarity": float(similarity),
                 "quality_level": quality_level,
                 "is_primary": is_primary
@@ -428,14 +567,14 @@ async def get_cleanup_encodings(face_id: int, threshold: float = 0.3, db: AsyncS
 
         logger.info(f"Prepared {len(scored_list)} encodings for cleanup (face {face_id}, threshold {threshold})")
 
-        return {
+        return ORJSONResponse({
             "face_id": face_id,
             "face_name": face.name,
             "total_encodings": len(scored_list),
             "threshold": float(threshold),
             "default_threshold": 0.3,
             "encodings": scored_list
-        }
+        })
 
     except HTTPException:
         raise
@@ -458,15 +597,15 @@ async def get_best_encoding_for_face(face_id: int, db: AsyncSession = Depends(ge
             raise HTTPException(status_code=404, detail=f"Face {face_id} not found")
 
         encoding_result = await db.execute(
-            select(FaceEncoding, Video.name)
+            select(*_ENCODING_SUMMARY_COLUMNS, Video.name)
             .outerjoin(Video, FaceEncoding.video_id == Video.id)
             .where(FaceEncoding.face_id == face_id)
             .order_by(FaceEncoding.quality_score.desc(), FaceEncoding.confidence.desc())
             .limit(1)
         )
-        encoding_data = encoding_result.first()
+        enc = encoding_result.first()
 
-        if not encoding_data:
+        if not enc:
             return {
                 "face_id": face_id,
                 "face_name": face.name,
@@ -474,19 +613,18 @@ async def get_best_encoding_for_face(face_id: int, db: AsyncSession = Depends(ge
                 "message": "No encodings available for this face"
             }
 
-        enc, video_name = encoding_data
         return {
             "face_id": face_id,
             "face_name": face.name,
             "encoding": {
                 "id": enc.id,
                 "video_id": enc.video_id,
-                "video_name": video_name or "Unknown Video",
-                "frame_timestamp": float(enc.frame_timestamp) if enc.frame_timestamp else None,
+                "video_name": enc.name or "Unknown Video",
+                "frame_timestamp": enc.frame_timestamp or None,
                 "thumbnail": enc.thumbnail or "",
-                "confidence": float(enc.confidence) if enc.confidence else 0.0,
-                "quality_score": float(enc.quality_score) if enc.quality_score else 0.0,
-                "created_at": enc.created_at.isoformat() if enc.created_at and hasattr(enc.created_at, 'isoformat') else str(enc.created_at) if enc.created_at else None
+                "confidence": enc.confidence or 0.0,
+                "quality_score": enc.quality_score or 0.0,
+                "created_at": str(enc.created_at) if enc.created_at else None
             }
         }
 
@@ -510,14 +648,13 @@ async def set_primary_encoding(face_id: int, encoding_id: int, db: AsyncSession
             raise HTTPException(status_code=404, detail=f"Face {face_id} not found")
 
         encoding_result = await db.execute(
-            select(FaceEncoding).where(
+            select(FaceEncoding.id).where(
                 FaceEncoding.id == encoding_id,
                 FaceEncoding.face_id == face_id
             )
         )
-        encoding = encoding_result.scalar_one_or_none()
 
-        if not encoding:
+        if encoding_result.scalar_one_or_none() is None:
             raise HTTPException(status_code=404, detail=f"Encoding {encoding_id} not found or doesn't belong to face {face_id}")
 
         face.primary_encoding_id = encoding_id
@@ -546,48 +683,50 @@ async def set_primary_encoding(face_id: int, encoding_id: int, db: AsyncSession
 async def get_face_catalog(db: AsyncSession = Depends(get_db)):
     """Get all faces in the catalog with their details."""
     try:
+        video_counts = _video_counts_subquery()
         result = await db.execute(
             select(
                 FaceID,
                 Actor,
-                func.count(VideoFace.id).label('video_count')
+                func.coalesce(video_counts.c.video_count, 0)
             )
-            .outerjoin(VideoFace, FaceID.id == VideoFace.face_id)
+            .outerjoin(video_counts, FaceID.id == video_counts.c.face_id)
             .outerjoin(Actor, FaceID.actor_id == Actor.id)
-            .group_by(FaceID.id, Actor.id)
             .order_by(FaceID.updated_at.desc())
         )
         face_rows = result.all()
 
-        catalog = []
-        for face, actor, video_count in face_rows:
-            encodings_result = await db.execute(
-                select(FaceEncoding, Video.media_type)
-                .outerjoin(Video, FaceEncoding.video_id == Video.id)
-                .where(FaceEncoding.face_id == face.id)
-            )
-            encodings_data = encodings_result.all()
+        # Image-sourced encodings per face (no linked video: frame 0 counts as an image)
+        image_counts_result = await db.execute(
+            select(FaceEncoding.face_id, func.count(FaceEncoding.id))
+            .outerjoin(Video, FaceEncoding.video_id == Video.id)
+            .where(or_(
+                Video.media_type == 'image',
+                and_(Video.media_type.is_(None), FaceEncoding.frame_timestamp == 0)
+            ))
+            .group_by(FaceEncoding.face_id)
+        )
+        image_counts = dict(image_counts_result.all())
 
-            image_count = 0
-            for enc, media_type in encodings_data:
-                if media_type == 'image' or (media_type is None and enc.frame_timestamp == 0):
-                    image_count += 1
+        # Catalog thumbnail: the user-selected primary encoding, else the best-quality one
+        thumbnails = {}
+        primary_ids = [face.primary_encoding_id for face, _, _ in face_rows if face.primary_encoding_id]
+        if primary_ids:
+            primary_result = await db.execute(
+                select(FaceEncoding.id, FaceEncoding.thumbnail).where(id_in(FaceEncoding.id, primary_ids))
+            )
+            primary_thumbnails = dict(primary_result.all())
+            for face, _, _ in face_rows:
+                if face.primary_encoding_id:
+                    thumbnails[face.id] = primary_thumbnails.get(face.primary_encoding_id)
 
-            if face.primary_encoding_id:
-                encoding_result = await db.execute(
-                    select(FaceEncoding)
-                    .where(FaceEncoding.id == face.primary_encoding_id)
-                )
-                best_encoding = encoding_result.scalar_one_or_none()
-            else:
-                encoding_result = await db.execute(
-                    select(FaceEncoding)
-                    .where(FaceEncoding.face_id == face.id)
-                    .order_by(FaceEncoding.quality_score.desc())
-                    .limit(1)
-                )
-                best_encoding = encoding_result.scalar_one_or_none()
+        best = await _best_encodings(
+            db, [face.id for face, _, _ in face_rows if not face.primary_encoding_id], FaceEncoding.thumbnail
+        )
+        thumbnails.update((face_id, row.thumbnail) for face_id, row in best.items())
 
+        catalog = []
+        for face, actor, video_count in face_rows:
             catalog.append({
                 "id": face.id,
                 "name": face.name,
@@ -595,49 +734,59 @@ async def get_face_catalog(db: AsyncSession = Depends(get_db)):
                 "actor_name": actor.name if actor else None,
                 "encoding_count": face.encoding_count,
                 "video_count": video_count,
-                "image_count": image_count,
-                "thumbnail": best_encoding.thumbnail if best_encoding else None,
+                "image_count": image_counts.get(face.id, 0),
+                "thumbnail": thumbnails.get(face.id),
                 "primary_encoding_id": face.primary_encoding_id,
                 "created_at": face.created_at,
                 "updated_at": face.updated_at
             })
 
-        return {
+        return ORJSONResponse({
             "faces": catalog,
             "total_count": len(catalog)
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error loading face catalog: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to load catalog: {str(e)}")
 
 
-@router.get("/{face_id}")
+@router.get("/{face_id:int}")
 async def get_face_details(face_id: int, db: AsyncSession = Depends(get_db)):
     """Get detailed information about a specific face."""
     try:
-        face = await db.get(FaceID, face_id)
-        if not face:
+        # Face and its encoding summaries in one round trip; a face without
+        # encodings comes back as a single row with NULL encoding columns
+        face_rows = (await db.execute(
+            select(FaceID, *_ENCODING_SUMMARY_COLUMNS)
+            .outerjoin(FaceEncoding, FaceEncoding.face_id == FaceID.id)
+            .where(FaceID.id == face_id)
+            .order_by(FaceEncoding.created_at.desc())
+        )).all()
+        if not face_rows:
             raise HTTPException(status_code=404, detail=f"Face ID {face_id} not found")
 
-        encodings_result = await db.execute(
-            select(FaceEncoding)
-            .where(FaceEncoding.face_id == face_id)
-            .order_by(FaceEncoding.created_at.desc())
-        )
-        encodings = encodings_result.scalars().all()
+        face = face_rows[0].FaceID
+        encodings = [row for row in face_rows if row.id is not None]
 
-        video_ids = list(set([enc.video_id for enc in encodings]))
+        # Distinct videos in encoding order (most recent first)
+        video_ids = list(dict.fromkeys(enc.video_id for enc in encodings if enc.video_id is not None))
         videos = []
-        for vid_id in video_ids:
-            video = await db.get(Video, vid_id)
-            if video:
-                videos.append({
+        if video_ids:
+            videos_result = await db.execute(
+                select(Video.id, Video.name, Video.display_name, Video.category)
+                .where(id_in(Video.id, video_ids))
+            )
+            videos_by_id = {
+                video.id: {
                     "id": video.id,
                     "name": video.name,
                     "display_name": video.display_name,
                     "category": video.category
-                })
+                }
+                for video in videos_result.all()
+            }
+            videos = [videos_by_id[video_id] for video_id in video_ids if video_id in videos_by_id]
 
         return {
             "id": face.id,
@@ -864,6 +1013,11 @@ async def delete_face(face_id: int, db: AsyncSession = Depends(get_db)):
         face_name = face.name
         encoding_count = face.encoding_count
 
+        # Clear the primary reference first so the cascaded encoding deletes
+        # don't violate the face_ids -> face_encodings foreign key
+        face.primary_encoding_id = None
+        await db.flush()
+
         await db.delete(face)
         await db.commit()
 
@@ -889,8 +1043,6 @@ async def delete_face(face_id: int, db: AsyncSession = Depends(get_db)):
 async def analyze_duplicate_embeddings(face_id: int, db: AsyncSession = Depends(get_db)):
     """Analyze embeddings for duplicates and suggest which ones to keep/delete."""
     try:
-        import base64
-
         face_result = await db.execute(
             select(FaceID).where(FaceID.id == face_id)
         )
@@ -900,15 +1052,9 @@ async def analyze_duplicate_embeddings(face_id: int, db: AsyncSession = Depends(
             logger.warning(f"Face {face_id} not found")
             raise HTTPException(status_code=404, detail=f"Face {face_id} not found")
 
-        encodings_result = await db.execute(
-            select(FaceEncoding, Video.name)
-            .outerjoin(Video, FaceEncoding.video_id == Video.id)
-            .where(FaceEncoding.face_id == face_id)
-            .order_by(FaceEncoding.quality_score.desc())
-        )
-        encodings_data = encodings_result.all()
+        encoding_bytes_by_id = await _face_encoding_bytes(db, face_id)
 
-        if not encodings_data:
+        if not encoding_bytes_by_id:
             return {
                 "face_id": face_id,
                 "face_name": face.name,
@@ -917,69 +1063,58 @@ async def analyze_duplicate_embeddings(face_id: int, db: AsyncSession = Depends(
                 "summary": "No embeddings to analyze"
             }
 
-        embeddings_list = []
-        for enc, video_name in encodings_data:
-            try:
-                embedding_bytes = base64.b64decode(enc.encoding)
-                embedding_array = np.frombuffer(embedding_bytes, dtype=np.float32)
+        # Stream the summary rows; thumbnails dominate their size
+        encodings_result = await db.stream(
+            select(*_ENCODING_SUMMARY_COLUMNS, Video.name)
+            .outerjoin(Video, FaceEncoding.video_id == Video.id)
+            .where(FaceEncoding.face_id == face_id)
+            .order_by(FaceEncoding.quality_score.desc())
+            .execution_options(yield_per=500)
+        )
 
-                embeddings_list.append({
-                    "id": enc.id,
-                    "video_id": enc.video_id,
-                    "video_name": video_name or "Unknown Video",
-                    "frame_timestamp": float(enc.frame_timestamp) if enc.frame_timestamp else None,
-                    "confidence": float(enc.confidence) if enc.confidence else 0.0,
-                    "quality_score": float(enc.quality_score) if enc.quality_score else 0.0,
-                    "thumbnail": enc.thumbnail or "",
-                    "vector": embedding_array
-                })
-            except Exception as e:
-                logger.error(f"Error decoding embedding {enc.id}: {str(e)}")
+        embeddings_list = []
+        embeddings_bytes = []
+        async for enc in encodings_result:
+            embedding_bytes = encoding_bytes_by_id.get(enc.id)
+            if embedding_bytes is None:
                 continue
 
+            embeddings_list.append({
+                "id": enc.id,
+                "video_id": enc.video_id,
+                "video_name": enc.name or "Unknown Video",
+                "frame_timestamp": enc.frame_timestamp or None,
+                "confidence": enc.confidence or 0.0,
+                "quality_score": enc.quality_score or 0.0,
+                "thumbnail": enc.thumbnail or ""
+            })
+            embeddings_bytes.append(embedding_bytes)
+
         if len(embeddings_list) < 2:
-            return {
+            return ORJSONResponse({
                 "face_id": face_id,
                 "face_name": face.name,
                 "total_encodings": len(embeddings_list),
                 "groups": [{
                     "group_id": 0,
-                    "embeddings": [
-                        {k: v for k, v in emb.items() if k != "vector"}
-                        for emb in embeddings_list
-                    ],
+                    "embeddings": embeddings_list,
                     "similarity": 1.0,
                     "best_embedding_id": embeddings_list[0]["id"] if embeddings_list else None,
                     "suggested_for_deletion": []
                 }],
                 "summary": "Only one embedding, no duplicates"
-            }
-
-        vectors = np.array([emb["vector"] for emb in embeddings_list])
-        similarity_matrix = cosine_similarity(vectors)
+            })
 
+        vectors = face_service.bytes_to_encodings(embeddings_bytes)
         similarity_threshold = 0.95
-        visited = set()
+        # O(N^2) numpy work runs off the event loop so other requests keep being served
+        similar_groups = await asyncio.to_thread(face_service.group_by_similarity, vectors, similarity_threshold)
         groups = []
 
-        for i in range(len(embeddings_list)):
-            if i in visited:
-                continue
-
-            group_indices = [i]
-            visited.add(i)
-
-            for j in range(i + 1, len(embeddings_list)):
-                if j not in visited and similarity_matrix[i][j] > similarity_threshold:
-                    group_indices.append(j)
-                    visited.add(j)
-
+        for group_indices, _ in similar_groups:
             group_indices.sort(key=lambda idx: embeddings_list[idx]["quality_score"], reverse=True)
 
-            group_embeddings = [
-                {k: v for k, v in embeddings_list[idx].items() if k != "vector"}
-                for idx in group_indices
-            ]
+            group_embeddings = [embeddings_list[idx] for idx in group_indices]
 
             best_embedding_id = embeddings_list[group_indices[0]]["id"]
 
@@ -994,20 +1129,21 @@ async def analyze_duplicate_embeddings(face_id: int, db: AsyncSession = Depends(
             groups.append({
                 "group_id": len(groups),
                 "embeddings": group_embeddings,
-                "similarity": float(similarity_matrix[group_indices[0]][group_indices[-1]]) if len(group_indices) > 1 else 1.0,
+                # vectors were normalized in place by group_by_similarity: the dot product is the cosine
+                "similarity": float(vectors[group_indices[0]] @ vectors[group_indices[-1]]) if len(group_indices) > 1 else 1.0,
                 "best_embedding_id": best_embedding_id,
                 "suggested_for_deletion": suggested_for_deletion
             })
 
         total_suggested_deletions = sum(len(g["suggested_for_deletion"]) for g in groups)
 
-        return {
+        return ORJSONResponse({
             "face_id": face_id,
             "face_name": face.name,
             "total_encodings": len(embeddings_list),
             "groups": groups,
             "summary": f"{len(groups)} group(s) found, {total_suggested_deletions} embedding(s) suggested for deletion"
-        }
+        })
 
     except HTTPException:
         raise
@@ -1029,68 +1165,43 @@ async def group_similar_faces(threshold: float = 0.5, db: AsyncSession = Depends
         Groups of similar faces with primary encoding similarity scores
     """
     try:
+        video_counts = _video_counts_subquery()
         faces_result = await db.execute(
-            select(FaceID)
+            select(FaceID, func.coalesce(video_counts.c.video_count, 0))
+            .outerjoin(video_counts, FaceID.id == video_counts.c.face_id)
             .order_by(FaceID.updated_at.desc())
         )
-        faces = faces_result.scalars().all()
+        face_rows = faces_result.all()
 
-        if not faces:
+        if not face_rows:
             return {
                 "groups": [],
                 "total_faces": 0,
                 "summary": "No faces in catalog"
             }
 
-        video_counts_result = await db.execute(
-            select(
-                FaceID.id,
-                func.count(VideoFace.id).label('video_count')
-            )
-            .outerjoin(VideoFace, FaceID.id == VideoFace.face_id)
-            .group_by(FaceID.id)
-        )
-        video_counts_data = video_counts_result.all()
-        video_counts_map = {face_id: count for face_id, count in video_counts_data}
+        faces = [face for face, _ in face_rows]
+        video_counts_map = {face.id: video_count for face, video_count in face_rows}
+
+        representative_encodings = await _representative_encodings(db, faces)
 
         faces_with_encodings = []
+        encodings_bytes = []
         faces_without_encodings = []
 
         for face in faces:
-            encoding = None
-
-            if face.primary_encoding_id:
-                primary_result = await db.execute(
-                    select(FaceEncoding)
-                    .where(FaceEncoding.id == face.primary_encoding_id)
-                )
-                encoding = primary_result.scalar_one_or_none()
-
-            if not encoding or not encoding.encoding:
-                best_result = await db.execute(
-                    select(FaceEncoding)
-                    .where(FaceEncoding.face_id == face.id)
-                    .order_by(FaceEncoding.quality_score.desc())
-                    .limit(1)
-                )
-                encoding = best_result.scalar_one_or_none()
-
-            if encoding and encoding.encoding:
-                try:
-                    encoding_vector = face_service.base64_to_encoding(encoding.encoding)
-                    video_count = video_counts_map.get(face.id, 0)
-                    faces_with_encodings.append({
-                        "face_id": face.id,
-                        "face_name": face.name,
-                        "encoding_id": encoding.id,
-                        "vector": encoding_vector,
-                        "thumbnail": encoding.thumbnail,
-                        "encoding_count": face.encoding_count,
-                        "video_count": video_count
-                    })
-                except Exception as e:
-                    logger.error(f"Error decoding encoding for face {face.id}: {e}")
-                    faces_without_encodings.append(face.id)
+            encoding = representative_encodings.get(face.id)
+
+            if encoding:
+                faces_with_encodings.append({
+                    "face_id": face.id,
+                    "face_name": face.name,
+                    "encoding_id": encoding.id,
+                    "thumbnail": encoding.thumbnail,
+                    "encoding_count": face.encoding_count,
+                    "video_count": video_counts_map.get(face.id, 0)
+                })
+                encodings_bytes.append(encoding.encoding)
             else:
                 faces_without_encodings.append(face.id)
 
@@ -1102,28 +1213,14 @@ async def group_similar_faces(threshold: float = 0.5, db: AsyncSession = Depends
                 "summary": "No faces with encodings to compare"
             }
 
-        vectors = np.array([f["vector"] for f in faces_with_encodings])
-        similarity_matrix = cosine_similarity(vectors)
-
-        visited = set()
+        vectors = face_service.bytes_to_encodings(encodings_bytes)
+        similar_groups = await asyncio.to_thread(face_service.group_by_similarity, vectors, threshold)
         groups = []
 
-        for i in range(len(faces_with_encodings)):
-            if i in visited:
-                continue
-
-            group_indices = [i]
-            visited.add(i)
-
-            for j in range(i + 1, len(faces_with_encodings)):
-                if j not in visited and similarity_matrix[i][j] > threshold:
-                    group_indices.append(j)
-                    visited.add(j)
-
+        for group_indices, similarities in similar_groups:
             group_faces = []
-            for idx in group_indices:
+            for idx, similarity_to_primary in zip(group_indices, similarities):
                 face_data = faces_with_encodings[idx]
-                similarity_to_primary = float(similarity_matrix[i][idx]) if idx != i else 1.0
 
                 group_faces.append({
                     "face_id": face_data["face_id"],
@@ -1144,14 +1241,14 @@ async def group_similar_faces(threshold: float = 0.5, db: AsyncSession = Depends
                     "can_merge": len(group_faces) >= 2
                 })
 
-        return {
+        return ORJSONResponse({
             "groups": groups,
             "total_faces": len(faces_with_encodings),
             "faces_without_primary_encoding": len(faces_without_encodings),
             "group_count": len(groups),
             "faces_in_groups": sum(g["face_count"] for g in groups),
             "summary": f"Found {len(groups)} group(s) with {sum(g['face_count'] for g in groups)} potentially similar faces"
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error grouping similar faces: {str(e)}", exc_info=True)
@@ -1187,61 +1284,45 @@ async def compare_faces(
         if len(faces) < 2:
             raise HTTPException(status_code=400, detail="Not enough faces found to compare")
 
+        representative_encodings = await _representative_encodings(db, faces)
+
         faces_data = []
+        encodings_bytes = []
         for face in faces:
-            encoding = None
-
-            if face.primary_encoding_id:
-                primary_result = await db.execute(
-                    select(FaceEncoding)
-                    .where(FaceEncoding.id == face.primary_encoding_id)
-                )
-                encoding = primary_result.scalar_one_or_none()
-
-            if not encoding or not encoding.encoding:
-                best_result = await db.execute(
-                    select(FaceEncoding)
-                    .where(FaceEncoding.face_id == face.id)
-                    .order_by(FaceEncoding.quality_score.desc())
-                    .limit(1)
-                )
-                encoding = best_result.scalar_one_or_none()
-
-            if encoding and encoding.encoding:
-                try:
-                    encoding_vector = face_service.base64_to_encoding(encoding.encoding)
-                    faces_data.append({
-                        "face_id": face.id,
-                        "face_name": face.name,
-                        "encoding_id": encoding.id,
-                        "vector": encoding_vector,
-                        "thumbnail": encoding.thumbnail,
-                        "encoding_count": face.encoding_count
-                    })
-                except Exception as e:
-                    logger.error(f"Error decoding encoding for face {face.id}: {e}")
-                    continue
+            encoding = representative_encodings.get(face.id)
+
+            if encoding:
+                faces_data.append({
+                    "face_id": face.id,
+                    "face_name": face.name,
+                    "encoding_id": encoding.id,
+                    "thumbnail": encoding.thumbnail,
+                    "encoding_count": face.encoding_count
+                })
+                encodings_bytes.append(encoding.encoding)
 
         if len(faces_data) < 2:
             raise HTTPException(status_code=400, detail=f"Not enough valid faces to compare. Found {len(faces_data)}/required 2. Some faces may not have any encodings.")
 
-        vectors = np.array([f["vector"] for f in faces_data])
-        similarity_matrix = cosine_similarity(vectors)
+        vectors = face_service.bytes_to_encodings(encodings_bytes)
+        similarity_matrix = await asyncio.to_thread(face_service.similarity_matrix, vectors)
+
+        # Each pair once (i < j), read from the upper triangle in one gather
+        pair_rows, pair_cols = np.triu_indices(len(faces_data), 1)
+        pair_similarities = similarity_matrix[pair_rows, pair_cols].tolist()
 
         comparisons = []
-        for i in range(len(faces_data)):
-            for j in range(i + 1, len(faces_data)):
-                similarity = float(similarity_matrix[i][j])
-                comparisons.append({
-                    "face1_id": faces_data[i]["face_id"],
-                    "face1_name": faces_data[i]["face_name"],
-                    "face2_id": faces_data[j]["face_id"],
-                    "face2_name": faces_data[j]["face_name"],
-                    "similarity": similarity,
-                    "similarity_percent": round(similarity * 100, 1),
-                    "would_group_at_75": similarity >= 0.75,
-                    "would_group_at_70": similarity >= 0.70
-                })
+        for i, j, similarity in zip(pair_rows.tolist(), pair_cols.tolist(), pair_similarities):
+            comparisons.append({
+                "face1_id": faces_data[i]["face_id"],
+                "face1_name": faces_data[i]["face_name"],
+                "face2_id": faces_data[j]["face_id"],
+                "face2_name": faces_data[j]["face_name"],
+                "similarity": similarity,
+                "similarity_percent": round(similarity * 100, 1),
+                "would_group_at_75": similarity >= 0.75,
+                "would_group_at_70": similarity >= 0.70
+            })
 
         comparisons.sort(key=lambda x: -x["similarity"])
 
@@ -1289,48 +1370,72 @@ async def merge_faces(
         if len(face_ids) < 2:
             raise HTTPException(status_code=400, detail="Need at least 2 faces to merge")
 
-        faces = []
+        faces_result = await db.execute(select(FaceID).where(id_in(FaceID.id, face_ids)))
+        faces_by_id = {face.id: face for face in faces_result.scalars().all()}
         for face_id in face_ids:
-            face = await db.get(FaceID, face_id)
-            if not face:
+            if face_id not in faces_by_id:
                 raise HTTPException(status_code=404, detail=f"Face ID {face_id} not found")
-            faces.append(face)
 
-        target_face = faces[0]
-        source_faces = faces[1:]
+        target_face = faces_by_id[face_ids[0]]
+        source_ids = [face_id for face_id in dict.fromkeys(face_ids[1:]) if face_id != target_face.id]
+        source_faces = [faces_by_id[face_id] for face_id in source_ids]
 
-        total_moved = 0
-        for source_face in source_faces:
-            encodings_result = await db.execute(
-                select(FaceEncoding).where(FaceEncoding.face_id == source_face.id)
-            )
-            encodings = encodings_result.scalars().all()
-
-            for encoding in encodings:
-                encoding.face_id = target_face.id
-                total_moved += 1
-
-            video_faces_result = await db.execute(
-                select(VideoFace).where(VideoFace.face_id == source_face.id)
+        # Move every source encoding to the target server-side, without loading them
+        moved_result = await db.execute(
+            update(FaceEncoding)
+            .where(id_in(FaceEncoding.face_id, source_ids))
+            .values(face_id=target_face.id)
+            .execution_options(synchronize_session=False)
+        )
+        total_moved = moved_result.rowcount
+
+        # One VideoFace per video for the target: the target's existing row, else the
+        # first source's row (in request order) is retargeted; the others add their
+        # appearance counts to it and are deleted
+        target_rows_result = await db.execute(
+            select(VideoFace.video_id, VideoFace.id, VideoFace.appearance_count)
+            .where(VideoFace.face_id == target_face.id)
+        )
+        keepers = {
+            row.video_id: {"id": row.id, "face_id": target_face.id, "appearance_count": row.appearance_count}
+            for row in target_rows_result.all()
+        }
+        source_rows_result = await db.execute(
+            select(VideoFace.id, VideoFace.video_id, VideoFace.face_id, VideoFace.appearance_count)
+            .where(id_in(VideoFace.face_id, source_ids))
+        )
+        source_order = {face_id: index for index, face_id in enumerate(source_ids)}
+        source_rows = sorted(source_rows_result.all(), key=lambda row: (source_order[row.face_id], row.id))
+
+        changed_keepers = {}
+        merged_row_ids = []
+        for row in source_rows:
+            keeper = keepers.get(row.video_id)
+            if keeper is None:
+                keepers[row.video_id] = keeper = {
+                    "id": row.id, "face_id": target_face.id, "appearance_count": row.appearance_count
+                }
+            else:
+                keeper["appearance_count"] += row.appearance_count
+                merged_row_ids.append(row.id)
+            changed_keepers[keeper["id"]] = keeper
+
+        if changed_keepers:
+            await db.execute(update(VideoFace), list(changed_keepers.values()))
+        if merged_row_ids:
+            await db.execute(
+                sql_delete(VideoFace)
+                .where(id_in(VideoFace.id, merged_row_ids))
+                .execution_options(synchronize_session=False)
             )
-            video_faces = video_faces_result.scalars().all()
-
-            for video_face in video_faces:
-                existing_result = await db.execute(
-                    select(VideoFace).where(
-                        (VideoFace.video_id == video_face.video_id) &
-                        (VideoFace.face_id == target_face.id)
-                    )
-                )
-                existing = existing_result.scalar_one_or_none()
 
-                if existing:
-                    existing.appearance_count += video_face.appearance_count
-                    await db.delete(video_face)
-                else:
-                    video_face.face_id = target_face.id
-
-            await db.delete(source_face)
+        await db.execute(
+            sql_delete(FaceID)
+            .where(id_in(FaceID.id, source_ids))
+            .execution_options(synchronize_session=False)
+        )
+        for source_face in source_faces:
+            db.expunge(source_face)
 
         target_face.encoding_count += total_moved
         target_face.updated_at = time.time()
@@ -1366,30 +1471,32 @@ async def merge_faces(
 async def get_face_stats(db: AsyncSession = Depends(get_db)):
     """Get face recognition statistics."""
     try:
-        total_faces_result = await db.execute(select(func.count(FaceID.id)))
-        total_faces = total_faces_result.scalar()
-
-        total_encodings_result = await db.execute(select(func.count(FaceEncoding.id)))
-        total_encodings = total_encodings_result.scalar()
-
-        linked_faces_result = await db.execute(
-            select(func.count(FaceID.id)).where(FaceID.actor_id.isnot(None))
+        version = get_data_version()
+        cached = _face_stats_cache.get(version)
+        if cached is not None:
+            return cached
+
+        # One scan per table, with the filtered counts as conditional aggregates;
+        # both aggregates go out as subqueries of a single statement (one round trip)
+        face_counts = select(
+            func.count(FaceID.id).label('total_faces'),
+            func.count(FaceID.id).filter(FaceID.actor_id.isnot(None)).label('linked_faces'),
+            func.count(FaceID.id).filter(FaceID.encoding_count == 0).label('orphaned_faces')
+        ).subquery()
+        encoding_counts = select(
+            func.count(FaceEncoding.id).label('total_encodings'),
+            func.count(FaceEncoding.id).filter(FaceEncoding.video_id.is_(None)).label('orphaned_encodings')
+        ).subquery()
+        counts_result = await db.execute(
+            select(face_counts, encoding_counts).select_from(face_counts.join(encoding_counts, true()))
         )
-        linked_faces = linked_faces_result.scalar()
+        counts = counts_result.one()
+        total_faces, linked_faces, orphaned_faces = counts.total_faces, counts.linked_faces, counts.orphaned_faces
+        total_encodings, orphaned_encodings = counts.total_encodings, counts.orphaned_encodings
 
         avg_encodings = total_encodings / total_faces if total_faces > 0 else 0
 
-        orphaned_faces_result = await db.execute(
-            select(func.count(FaceID.id)).where(FaceID.encoding_count == 0)
-        )
-        orphaned_faces = orphaned_faces_result.scalar()
-
-        orphaned_encodings_result = await db.execute(
-            select(func.count(FaceEncoding.id)).where(FaceEncoding.video_id.is_(None))
-        )
-        orphaned_encodings = orphaned_encodings_result.scalar()
-
-        return {
+        stats = {
             "total_faces": total_faces,
             "total_encodings": total_encodings,
             "linked_to_actors": linked_faces,
@@ -1397,6 +1504,8 @@ async def get_face_stats(db: AsyncSession = Depends(get_db)):
             "orphaned_faces": orphaned_faces,
             "orphaned_encodings": orphaned_encodings
         }
+        _face_stats_cache.set(version, stats)
+        return stats
 
     except Exception as e:
         logger.error(f"Error getting face stats: {e}")
@@ -1407,19 +1516,22 @@ async def get_face_stats(db: AsyncSession = Depends(get_db)):
 async def cleanup_orphaned_faces(db: AsyncSession = Depends(get_db)):
     """Clean up orphaned faces (no encodings or no video links)."""
     try:
-        faces_no_encodings_result = await db.execute(
-            select(FaceID).where(FaceID.encoding_count == 0)
-        )
-        faces_no_encodings = faces_no_encodings_result.scalars().all()
-
-        faces_no_videos_result = await db.execute(
+        # One pass over face_ids; the video check is an anti-join (NOT EXISTS)
+        orphaned_result = await db.execute(
             select(FaceID)
-            .outerjoin(VideoFace, VideoFace.face_id == FaceID.id)
-            .where(VideoFace.id.is_(None))
+            .where(or_(
+                FaceID.encoding_count == 0,
+                ~exists().where(VideoFace.face_id == FaceID.id)
+            ))
+            .order_by(FaceID.id)
         )
-        faces_no_videos = faces_no_videos_result.scalars().all()
+        orphaned_faces = {face.id: face for face in orphaned_result.scalars().all()}
 
-        orphaned_faces = {face.id: face for face in faces_no_encodings + faces_no_videos}
+        # face_ids.primary_encoding_id references face_encodings: clear it first
+        # so the cascaded encoding deletes don't violate the foreign key
+        for face in orphaned_faces.values():
+            face.primary_encoding_id = None
+        await db.flush()
 
         deleted_count = 0
         deleted_names = []
@@ -1,23 +1,59 @@
 """Video fingerprinting and duplicate detection endpoints."""
 
+import asyncio
 import base64
 import logging
+import os
 import time
+from collections import defaultdict
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, func, case, delete as sql_delete
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, func, insert, update, delete as sql_delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, Video, VideoFingerprint
-from fingerprint_service import FingerprintService
+from database import get_db, Video, VideoFingerprint, id_in, phash_to_int64
+from fingerprint_service import fingerprint_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["fingerprints"])
 
 
+async def _insert_fingerprints(db: AsyncSession, video_id: int, frames: List[Tuple[int, str]]) -> None:
+    """Insert (frame_position, phash) rows for a video as one executemany."""
+    if not frames:
+        return
+    now = time.time()
+    await db.execute(
+        insert(VideoFingerprint),
+        [
+            {"video_id": video_id, "frame_position": position, "phash": phash, "created_at": now}
+            for position, phash in frames
+        ]
+    )
+
+
+async def _existing_frame_positions(db: AsyncSession, video_id: int) -> set:
+    """Frame positions already fingerprinted for a video."""
+    result = await db.execute(
+        select(VideoFingerprint.frame_position).where(VideoFingerprint.video_id == video_id)
+    )
+    return set(result.scalars().all())
+
+
+def _phash_from_base64(image_b64: str):
+    """Decode a base64 image (optionally a data: URL) and return its pHash (blocking - run in a worker thread)."""
+    # partition rather than split: no list, and no copy when there is no prefix
+    _, sep, payload = image_b64.partition('base64,')
+    return fingerprint_service.generate_fingerprint_from_image_bytes(
+        base64.b64decode(payload if sep else image_b64, validate=False)
+    )
+
+
 @router.post("/api/videos/{video_id}/fingerprint")
 async def generate_fingerprint(video_id: int, db: AsyncSession = Depends(get_db)):
     """Generate fingerprint for a specific video (user-triggered, on-demand)."""
@@ -35,21 +71,13 @@ async def generate_fingerprint(video_id: int, db: AsyncSession = Depends(get_db)
             "video_name": video.display_name or video.name
         }
 
-    fingerprint_service = FingerprintService()
     try:
         fingerprints = await fingerprint_service.generate_fingerprints(video.path)
 
         if not fingerprints:
             raise HTTPException(status_code=500, detail="Failed to generate fingerprints")
 
-        for position, phash in fingerprints:
-            fp = VideoFingerprint(
-                video_id=video_id,
-                frame_position=position,
-                phash=phash,
-                created_at=time.time()
-            )
-            db.add(fp)
+        await _insert_fingerprints(db, video_id, fingerprints)
 
         video.fingerprint_generated = 1
         video.fingerprinted_at = time.time()
@@ -99,16 +127,20 @@ async def check_duplicate(
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    fingerprint_service = FingerprintService()
     temp_fingerprints = await fingerprint_service.generate_fingerprints(video.path)
 
     if not temp_fingerprints:
         raise HTTPException(status_code=500, detail="Failed to generate fingerprint for comparison")
 
     library_fps = await db.execute(
-        select(VideoFingerprint).where(VideoFingerprint.video_id != video_id)
+        select(VideoFingerprint.video_id, VideoFingerprint.phash_int)
+        .where(
+            VideoFingerprint.video_id != video_id,
+            VideoFingerprint.phash_int.is_not(None)
+        )
+        .order_by(VideoFingerprint.video_id)
     )
-    library_fps = library_fps.scalars().all()
+    library_fps = library_fps.all()
 
     if not library_fps:
         return {
@@ -117,16 +149,18 @@ async def check_duplicate(
             "matches": []
         }
 
-    video_scores = {}
-
-    for _, temp_hash in temp_fingerprints:
-        for lib_fp in library_fps:
-            distance = fingerprint_service.hamming_distance(temp_hash, lib_fp.phash)
-
-            if lib_fp.video_id not in video_scores:
-                video_scores[lib_fp.video_id] = distance
-            else:
-                video_scores[lib_fp.video_id] = min(video_scores[lib_fp.video_id], distance)
+    temp_hashes = []
+    for _, phash in temp_fingerprints:
+        try:
+            temp_hashes.append(phash_to_int64(phash))
+        except (TypeError, ValueError):
+            logger.warning(f"Skipping invalid fingerprint hash: {phash!r}")
+
+    video_scores = fingerprint_service.closest_video_distances(
+        temp_hashes,
+        [lib_video_id for lib_video_id, _ in library_fps],
+        [phash_int for _, phash_int in library_fps]
+    )
 
     matches = [
         (vid, dist) for vid, dist in video_scores.items()
@@ -186,16 +220,22 @@ async def find_all_duplicates(
     db: AsyncSession = Depends(get_db)
 ):
     """Find all duplicate groups in the fingerprinted library."""
-    fingerprint_service = FingerprintService()
 
-    query = select(Video).where(Video.fingerprint_generated == 1)
+    # Only (video_id, phash_int) pairs, streamed - no Video/VideoFingerprint objects for the library
+    fingerprints_query = (
+        select(VideoFingerprint.video_id, VideoFingerprint.phash_int)
+        .join(Video, Video.id == VideoFingerprint.video_id)
+        .where(Video.fingerprint_generated == 1)
+    )
     if folder:
-        query = query.where(Video.category == folder)
+        fingerprints_query = fingerprints_query.where(Video.category == folder)
 
-    fingerprinted_videos = await db.execute(query)
-    fingerprinted_videos = fingerprinted_videos.scalars().all()
+    video_fingerprints = defaultdict(list)
+    all_fingerprints = await db.stream(fingerprints_query.execution_options(yield_per=5000))
+    async for video_id, phash_int in all_fingerprints:
+        video_fingerprints[video_id].append(phash_int)
 
-    if len(fingerprinted_videos) < 2:
+    if len(video_fingerprints) < 2:
         return {
             "duplicate_groups": [],
             "total_groups": 0,
@@ -203,110 +243,73 @@ async def find_all_duplicates(
             "message": "Need at least 2 fingerprinted videos to find duplicates"
         }
 
-    video_ids = [v.id for v in fingerprinted_videos]
-    fingerprints_query = select(VideoFingerprint).where(VideoFingerprint.video_id.in_(video_ids))
-    all_fingerprints = await db.execute(fingerprints_query)
-    all_fingerprints = all_fingerprints.scalars().all()
-
-    video_fingerprints = {}
-    for fp in all_fingerprints:
-        if fp.video_id not in video_fingerprints:
-            video_fingerprints[fp.video_id] = []
-        video_fingerprints[fp.video_id].append(fp)
+    video_ids = list(video_fingerprints.keys())
+    # Pairwise hash comparison is CPU-bound; keep it off the event loop
+    video_scores = await asyncio.to_thread(
+        fingerprint_service.find_similar_video_pairs, video_fingerprints, threshold
+    )
 
-    video_scores = {}
+    duplicate_groups = fingerprint_service.group_similar_videos(video_ids, video_scores)
 
-    video_ids = list(video_fingerprints.keys())
-    for i, vid1 in enumerate(video_ids):
-        for vid2 in video_ids[i+1:]:
-            fps1 = video_fingerprints.get(vid1, [])
-            fps2 = video_fingerprints.get(vid2, [])
-
-            min_distance = float('inf')
-            for fp1 in fps1:
-                for fp2 in fps2:
-                    distance = fingerprint_service.hamming_distance(fp1.phash, fp2.phash)
-                    min_distance = min(min_distance, distance)
-
-            if min_distance <= threshold:
-                video_scores[(vid1, vid2)] = min_distance
-
-    parent = {}
-
-    def find(x):
-        if x not in parent:
-            parent[x] = x
-        if parent[x] != x:
-            parent[x] = find(parent[x])
-        return parent[x]
-
-    def union(x, y):
-        px, py = find(x), find(y)
-        if px != py:
-            parent[px] = py
-
-    for (vid1, vid2), distance in video_scores.items():
-        union(vid1, vid2)
-
-    groups = {}
-    for vid in video_ids:
-        if vid in video_fingerprints:
-            root = find(vid)
-            if root not in groups:
-                groups[root] = []
-            groups[root].append(vid)
-
-    duplicate_groups = [group for group in groups.values() if len(group) >= 2]
+    # Similarity of every pair, converted in one vectorized call, in a symmetric
+    # adjacency so lookups from a group's first video need no (min, max) key
+    pair_similarities = fingerprint_service.similarity_percent_array(
+        np.fromiter(video_scores.values(), dtype=np.int64, count=len(video_scores))
+    ).tolist()
+    adjacency = defaultdict(dict)
+    for (vid1, vid2), similarity in zip(video_scores, pair_similarities):
+        adjacency[vid1][vid2] = similarity
+        adjacency[vid2][vid1] = similarity
 
     all_duplicate_ids = [vid for group in duplicate_groups for vid in group]
 
     if all_duplicate_ids:
         duplicate_videos = await db.execute(
-            select(Video).where(Video.id.in_(all_duplicate_ids))
+            select(Video).where(id_in(Video.id, all_duplicate_ids))
         )
         duplicate_videos = duplicate_videos.scalars().all()
         video_dict = {v.id: v for v in duplicate_videos}
 
         result_groups = []
+        total_duplicates = 0
         for group in duplicate_groups:
-            videos_in_group = []
-            for vid in group:
-                v = video_dict.get(vid)
-                if v:
-                    similarity = 100
-                    if vid != group[0]:
-                        pair_key = (min(vid, group[0]), max(vid, group[0]))
-                        if pair_key in video_scores:
-                            distance = video_scores[pair_key]
-                            similarity = fingerprint_service.similarity_percent(distance)
-
-                    videos_in_group.append({
-                        "id": v.id,
-                        "name": v.name,
-                        "display_name": v.display_name or v.name,
-                        "category": v.category,
-                        "subcategory": v.subcategory,
-                        "thumbnail_url": v.thumbnail_url,
-                        "size": v.size,
-                        "duration": v.duration,
-                        "similarity_percent": round(similarity, 1),
-                        "media_type": v.media_type or 'video'
-                    })
+            # Similarity to the group's first video; 100% for itself or no direct pair
+            first_similarities = adjacency[group[0]]
+
+            videos_in_group = [
+                {
+                    "id": v.id,
+                    "name": v.name,
+                    "display_name": v.display_name or v.name,
+                    "category": v.category,
+                    "subcategory": v.subcategory,
+                    "thumbnail_url": v.thumbnail_url,
+                    "size": v.size,
+                    "duration": v.duration,
+                    "similarity_percent": round(first_similarities.get(vid, 100.0), 1),
+                    "media_type": v.media_type or 'video'
+                }
+                for vid in group
+                if (v := video_dict.get(vid))
+            ]
 
             if len(videos_in_group) >= 2:
                 result_groups.append({
                     "videos": videos_in_group,
                     "count": len(videos_in_group)
                 })
+                total_duplicates += len(videos_in_group)
 
         result_groups.sort(key=lambda x: x["count"], reverse=True)
 
-        return {
+        # Plain dicts/lists/scalars only: hand them straight to orjson and skip
+        # FastAPI's jsonable_encoder walk over every group
+        return ORJSONResponse({
             "duplicate_groups": result_groups,
             "total_groups": len(result_groups),
-            "total_duplicates": sum(g["count"] for g in result_groups),
-            "message": f"Found {len(result_groups)} duplicate groups with {sum(g['count'] for g in result_groups)} total videos"
-        }
+            "total_duplicates": total_duplicates,
+            "message": f"Found {len(result_groups)} duplicate groups with {total_duplicates} total videos"
+        })
 
     return {
         "duplicate_groups": [],
@@ -341,7 +344,7 @@ async def get_fingerprint_stats_by_folder(db: AsyncSession = Depends(get_db)):
         select(
             Video.category,
             func.count(Video.id).label('total_videos'),
-            func.sum(case((Video.fingerprint_generated == 1, 1), else_=0)).label('fingerprinted_count')
+            func.count(Video.id).filter(Video.fingerprint_generated == 1).label('fingerprinted_count')
         ).group_by(Video.category)
     )
 
@@ -349,7 +352,7 @@ async def get_fingerprint_stats_by_folder(db: AsyncSession = Depends(get_db)):
     for row in result:
         category = row.category
         total = row.total_videos
-        fingerprinted = row.fingerprinted_count or 0
+        fingerprinted = row.fingerprinted_count
 
         folder_stats[category] = {
             "total": total,
@@ -381,21 +384,19 @@ async def get_video_fingerprints(video_id: int, db: AsyncSession = Depends(get_d
             "message": "No fingerprints found for this video"
         }
 
-    fingerprint_service = FingerprintService()
-    frames_data = []
+    # frame_position is stored as a percentage (0-100)
+    thumbnails = await fingerprint_service.extract_frame_images(
+        video.path, [fp.frame_position / 100.0 for fp in fingerprints]
+    )
 
-    for fp in fingerprints:
-        try:
-            thumbnail_data = await fingerprint_service.get_frame_thumbnail(video.path, fp.frame_position)
-            thumbnail_b64 = base64.b64encode(thumbnail_data).decode('utf-8') if thumbnail_data else None
-        except Exception:
-            thumbnail_b64 = None
+    frames_data = []
 
+    for fp, thumbnail in zip(fingerprints, thumbnails):
         frames_data.append({
             "id": fp.id,
             "frame_position": fp.frame_position,
             "phash": fp.phash,
-            "thumbnail": thumbnail_b64,
+            "thumbnail": thumbnail,
             "created_at": fp.created_at
         })
 
@@ -414,29 +415,28 @@ async def delete_fingerprint_frame(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a specific fingerprint frame."""
-    result = await db.execute(
-        select(VideoFingerprint).where(
+    deleted = await db.execute(
+        sql_delete(VideoFingerprint)
+        .where(
             VideoFingerprint.id == fingerprint_id,
             VideoFingerprint.video_id == video_id
         )
+        .returning(VideoFingerprint.id)
     )
-    fingerprint = result.scalar_one_or_none()
-
-    if not fingerprint:
+    if deleted.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Fingerprint not found")
 
-    await db.delete(fingerprint)
-
     remaining = await db.execute(
         select(func.count(VideoFingerprint.id)).where(VideoFingerprint.video_id == video_id)
     )
     remaining_count = remaining.scalar()
 
     if remaining_count == 0:
-        video = await db.get(Video, video_id)
-        if video:
-            video.fingerprint_generated = 0
-            video.fingerprinted_at = None
+        await db.execute(
+            update(Video)
+            .where(Video.id == video_id)
+            .values(fingerprint_generated=0, fingerprinted_at=None)
+        )
 
     await db.commit()
 
@@ -468,20 +468,13 @@ async def add_fingerprint_frame(
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=400, detail=f"Fingerprint at position {frame_position} already exists")
 
-    fingerprint_service = FingerprintService()
     try:
         phash = await fingerprint_service.generate_fingerprint_at_position(video.path, frame_position)
 
         if not phash:
             raise HTTPException(status_code=500, detail="Failed to generate fingerprint")
 
-        fp = VideoFingerprint(
-            video_id=video_id,
-            frame_position=frame_position,
-            phash=phash,
-            created_at=time.time()
-        )
-        db.add(fp)
+        await _insert_fingerprints(db, video_id, [(frame_position, phash)])
 
         video.fingerprint_generated = 1
         if not video.fingerprinted_at:
@@ -515,29 +508,42 @@ async def extract_fingerprint_frames(
     if positions is None:
         positions = [5, 25, 50, 75, 95]
 
-    fingerprint_service = FingerprintService()
-    frames_data = []
-
-    for position in positions:
-        try:
-            thumbnail_data = await fingerprint_service.get_frame_thumbnail(video.path, position)
-            phash = await fingerprint_service.generate_fingerprint_at_position(video.path, position)
+    # Positions are percentages; reject out-of-range ones before starting any ffmpeg work
+    position_array = np.fromiter(positions, dtype=np.int64, count=len(positions))
+    invalid = np.flatnonzero((position_array < 0) | (position_array > 100))
+    if invalid.size:
+        raise HTTPException(status_code=400, detail=f"Position {positions[invalid[0]]} must be between 0 and 100")
+    fractions = (position_array / 100.0).tolist()
+
+    # Each position is independent ffmpeg work - run them concurrently, one per CPU
+    semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+    async def extract_position(position: int, fraction: float) -> dict:
+        async with semaphore:
+            phash, thumbnail = await asyncio.gather(
+                fingerprint_service.generate_single_frame_fingerprint(video.path, fraction),
+                fingerprint_service.extract_frame_image(video.path, fraction)
+            )
+        return {
+            "frame_position": position,
+            "phash": phash,
+            "thumbnail": thumbnail
+        }
 
-            thumbnail_b64 = base64.b64encode(thumbnail_data).decode('utf-8') if thumbnail_data else None
+    results = await asyncio.gather(*[extract_position(position, fraction) for position, fraction in zip(positions, fractions)], return_exceptions=True)
 
-            frames_data.append({
-                "frame_position": position,
-                "phash": phash,
-                "thumbnail": thumbnail_b64
-            })
-        except Exception as e:
-            logger.warning(f"Failed to extract frame at position {position}: {e}")
+    frames_data = []
+    for position, result in zip(positions, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to extract frame at position {position}: {result}")
             frames_data.append({
                 "frame_position": position,
                 "phash": None,
                 "thumbnail": None,
-                "error": str(e)
+                "error": str(result)
             })
+        else:
+            frames_data.append(result)
 
     return {
         "video_id": video_id,
@@ -557,18 +563,13 @@ async def add_fingerprint_frames(
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    fingerprint_service = FingerprintService()
     added_frames = []
     failed_frames = []
 
+    existing_positions = await _existing_frame_positions(db, video_id)
+
     for position in positions:
-        existing = await db.execute(
-            select(VideoFingerprint).where(
-                VideoFingerprint.video_id == video_id,
-                VideoFingerprint.frame_position == position
-            )
-        )
-        if existing.scalar_one_or_none():
+        if position in existing_positions:
             failed_frames.append({"position": position, "error": "Already exists"})
             continue
 
@@ -576,13 +577,7 @@ async def add_fingerprint_frames(
             phash = await fingerprint_service.generate_fingerprint_at_position(video.path, position)
 
             if phash:
-                fp = VideoFingerprint(
-                    video_id=video_id,
-                    frame_position=position,
-                    phash=phash,
-                    created_at=time.time()
-                )
-                db.add(fp)
+                existing_positions.add(position)
                 added_frames.append({"position": position, "phash": phash})
             else:
                 failed_frames.append({"position": position, "error": "Failed to generate hash"})
@@ -591,6 +586,9 @@ async def add_fingerprint_frames(
             failed_frames.append({"position": position, "error": str(e)})
 
     if added_frames:
+        await _insert_fingerprints(
+            db, video_id, [(frame["position"], frame["phash"]) for frame in added_frames]
+        )
         video.fingerprint_generated = 1
         if not video.fingerprinted_at:
             video.fingerprinted_at = time.time()
@@ -617,11 +615,24 @@ async def add_fingerprint_frames_from_images(
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    fingerprint_service = FingerprintService()
     added_frames = []
     failed_frames = []
 
-    for item in image_data:
+    existing_positions = await _existing_frame_positions(db, video_id)
+
+    # Decode + hash every candidate image in worker threads up front; the
+    # acceptance checks below stay sequential so in-batch duplicates behave as before
+    candidates = [
+        i for i, item in enumerate(image_data)
+        if item.get('image') and item.get('position', 0) not in existing_positions
+    ]
+    hash_results = await asyncio.gather(
+        *[asyncio.to_thread(_phash_from_base64, image_data[i]['image']) for i in candidates],
+        return_exceptions=True
+    )
+    phash_by_index = dict(zip(candidates, hash_results))
+
+    for i, item in enumerate(image_data):
         position = item.get('position', 0)
         image_b64 = item.get('image')
 
@@ -629,28 +640,17 @@ async def add_fingerprint_frames_from_images(
             failed_frames.append({"position": position, "error": "No image data"})
             continue
 
-        existing = await db.execute(
-            select(VideoFingerprint).where(
-                VideoFingerprint.video_id == video_id,
-                VideoFingerprint.frame_position == position
-            )
-        )
-        if existing.scalar_one_or_none():
+        if position in existing_positions:
             failed_frames.append({"position": position, "error": "Already exists"})
             continue
 
         try:
-            image_bytes = base64.b64decode(image_b64)
-            phash = fingerprint_service.generate_fingerprint_from_image_bytes(image_bytes)
+            phash = phash_by_index[i]
+            if isinstance(phash, Exception):
+                raise phash
 
             if phash:
-                fp = VideoFingerprint(
-                    video_id=video_id,
-                    frame_position=position,
-                    phash=phash,
-                    created_at=time.time()
-                )
-                db.add(fp)
+                existing_positions.add(position)
                 added_frames.append({"position": position, "phash": phash})
             else:
                 failed_frames.append({"position": position, "error": "Failed to generate hash"})
@@ -659,6 +659,9 @@ async def add_fingerprint_frames_from_images(
             failed_frames.append({"position": position, "error": str(e)})
 
     if added_frames:
+        await _insert_fingerprints(
+            db, video_id, [(frame["position"], frame["phash"]) for frame in added_frames]
+        )
         video.fingerprint_generated = 1
         if not video.fingerprinted_at:
             video.fingerprinted_at = time.time()
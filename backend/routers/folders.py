@@ -1,6 +1,6 @@
 """Folder management and folder groups endpoints."""
 
-import hashlib
+import asyncio
 import json
 import logging
 import time
@@ -8,14 +8,17 @@ import uuid
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import config
 from database import get_db, Video, FolderGroup
+from file_scanner import scanner
 from video_service import VideoService
 from schemas.common import RenameFolderRequest, BulkHashRenameRequest
 from schemas.folder import FolderGroupCreate, FolderGroupUpdate, FolderGroupReorder
+from utils.constants import FILE_HASH_CONCURRENCY
+from utils.hash_naming import hash_name_from_digest, hash_file_digest
 from routers.roots import get_thumbnail_db
 
 logger = logging.getLogger(__name__)
@@ -23,6 +26,13 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/folders", tags=["folders"])
 
 
+def _rename_digest(video_path: Path):
+    """Digest used for hash renames, or None if the file is gone. Blocking."""
+    if not video_path.exists():
+        return None
+    return hash_file_digest(video_path, sampled=config.sampled_rename_hash)
+
+
 def parse_folders(folders_str):
     """Parse folders string - handles both JSON array and comma-separated formats."""
     if not folders_str:
@@ -45,8 +55,6 @@ def serialize_folders(folders_list):
 @router.get("/structure")
 async def get_folder_structure_groups(db: AsyncSession = Depends(get_db)):
     """Get folder structure with groups for sidebar navigation."""
-    from file_scanner import scanner
-
     # Get all physical folders
     physical_folders = []
     for item in config.root_directory.iterdir():
@@ -392,36 +400,47 @@ async def bulk_hash_rename_videos(
 
         renamed_videos = []
         failed_videos = []
+        # Files renamed on disk, written back to the DB in one bulk UPDATE
+        video_updates = []
+        path_pairs = []
+        # Paths already held by rows in this folder. A target that collides with one
+        # (e.g. a stale row whose file is gone) would fail the unique constraint and
+        # with it the whole batch, so reject that video up front instead.
+        claimed_paths = {video.path for video in videos}
+
+        # Hashing reads whole files - run it in worker threads, a few files at a time
+        semaphore = asyncio.Semaphore(FILE_HASH_CONCURRENCY)
+
+        async def digest(video_path: Path):
+            async with semaphore:
+                return await asyncio.to_thread(_rename_digest, video_path)
+
+        digests = await asyncio.gather(
+            *(digest(Path(video.path)) for video in videos),
+            return_exceptions=True
+        )
 
-        for video in videos:
+        # Renames stay sequential, in folder order, so claimed_paths is deterministic
+        for video, hash_str in zip(videos, digests):
             try:
                 video_path = Path(video.path)
 
-                if not video_path.exists():
+                if isinstance(hash_str, Exception):
+                    raise hash_str
+
+                if hash_str is None:
                     failed_videos.append({
                         "name": video.name,
                         "error": "File not found"
                     })
                     continue
 
-                sha1_hash = hashlib.sha1()
-                with open(video_path, 'rb') as f:
-                    for chunk in iter(lambda: f.read(8192), b''):
-                        sha1_hash.update(chunk)
-
-                hash_str = sha1_hash.hexdigest()
-
-                part1 = hash_str[0:4]
-                part2 = hash_str[4:8]
-                part3 = hash_str[2] + hash_str[4] + hash_str[6] + hash_str[10]
-                part4 = hash_str[10] + hash_str[6] + hash_str[4] + hash_str[2]
-
-                new_name_base = part1 + part2 + part3 + part4
+                new_name_base = hash_name_from_digest(hash_str)
                 ext = video_path.suffix
                 new_name = f"{new_name_base}{ext}"
 
                 new_path = video_path.parent / new_name
-                if new_path.exists() and new_path != video_path:
+                if new_path != video_path and await asyncio.to_thread(new_path.exists):
                     failed_videos.append({
                         "name": video.name,
                         "error": f"Target name already exists: {new_name}"
@@ -436,16 +455,25 @@ async def bulk_hash_rename_videos(
                     })
                     continue
 
-                video_path.rename(new_path)
-
-                await thumbnail_db.update_path_hash(str(video_path), str(new_path))
+                if str(new_path) in claimed_paths:
+                    failed_videos.append({
+                        "name": video.name,
+                        "error": f"Target name is used by another library entry: {new_name}"
+                    })
+                    continue
 
-                video.path = str(new_path)
-                video.name = new_name
-                video.extension = ext.lower()
-                video.thumbnail_url = f"/api/thumbnails/{video.id}"
+                await asyncio.to_thread(video_path.rename, new_path)
+                claimed_paths.discard(str(video_path))
+                claimed_paths.add(str(new_path))
 
-                await db.commit()
+                video_updates.append({
+                    "id": video.id,
+                    "path": str(new_path),
+                    "name": new_name,
+                    "extension": ext.lower(),
+                    "thumbnail_url": f"/api/thumbnails/{video.id}"
+                })
+                path_pairs.append((str(video_path), str(new_path)))
 
                 renamed_videos.append({
                     "old_name": video.name,
@@ -461,9 +489,27 @@ async def bulk_hash_rename_videos(
                     "name": video.name,
                     "error": str(e)
                 })
-                await db.rollback()
                 continue
 
+        if video_updates:
+            try:
+                await db.execute(update(Video), video_updates)
+                await db.commit()
+            except Exception:
+                # Put the files back so disk and database stay consistent
+                await db.rollback()
+                for old_path, new_path in path_pairs:
+                    try:
+                        await asyncio.to_thread(Path(new_path).rename, old_path)
+                    except Exception as revert_error:
+                        logger.error(f"Failed to revert rename {new_path} -> {old_path}: {revert_error}")
+                raise
+
+            try:
+                await thumbnail_db.update_path_hashes(path_pairs)
+            except Exception as e:
+                logger.warning(f"Failed to update thumbnail hashes after bulk rename: {e}")
+
         return {
             "message": f"Bulk rename completed: {len(renamed_videos)} renamed, {len(failed_videos)} failed",
             "folder": folder_name,
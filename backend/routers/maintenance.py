@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, Video
+from database import get_db, get_pool_status, fix_existing_media_types, Video
+from routers.roots import get_thumbnail_db
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +23,6 @@ async def fix_media_types():
     detection was implemented. It re-scans all existing Video records
     and updates their media_type based on file extension.
     """
-    from database import fix_existing_media_types
-
     logger.info("Starting media type fix process...")
     stats = await fix_existing_media_types()
 
@@ -89,3 +88,13 @@ async def mark_folder_as_images(
         logger.error(f"Error marking folder as images: {e}")
         await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/db-pool")
+async def get_db_pool_status():
+    """Get connection pool usage for the main and thumbnail databases."""
+    thumbnail_db = get_thumbnail_db()
+    return {
+        "database": get_pool_status(),
+        "thumbnails": get_pool_status(thumbnail_db.engine) if thumbnail_db else {}
+    }
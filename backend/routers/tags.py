@@ -3,17 +3,23 @@
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, Tag, Video
+from color_utils import generate_vibrant_color
+from database import get_db, get_data_version, Tag, Video
 from video_service import VideoService
 from routers.roots import get_thumbnail_db
+from utils.versioned_cache import VersionedCache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tags", tags=["tags"])
 
+# Tag listings are read far more often than they change; any commit invalidates them
+_tags_cache = VersionedCache()
+_unused_tags_cache = VersionedCache()
+
 
 @router.post("/videos/{video_id}/tags")
 async def add_tag_to_video(
@@ -45,18 +51,32 @@ async def remove_tag_from_video(
 @router.get("")
 async def get_all_tags(db: AsyncSession = Depends(get_db)):
     """Get all available tags."""
+    version = get_data_version()
+    cached = _tags_cache.get(version)
+    if cached is not None:
+        return cached
+
     service = VideoService(db, get_thumbnail_db())
     tags = await service.get_all_tags()
-    return [{"id": tag.id, "name": tag.name, "color": tag.color} for tag in tags]
+    result = [{"id": tag.id, "name": tag.name, "color": tag.color} for tag in tags]
+    _tags_cache.set(version, result)
+    return result
 
 
 # NOTE: /unused routes must come BEFORE /{tag_id} to avoid route conflicts
 @router.get("/unused")
 async def get_unused_tags(db: AsyncSession = Depends(get_db)):
     """Get all tags that are not assigned to any videos."""
+    version = get_data_version()
+    cached = _unused_tags_cache.get(version)
+    if cached is not None:
+        return cached
+
     service = VideoService(db, get_thumbnail_db())
     unused_tags = await service.get_unused_tags()
-    return [{"id": tag.id, "name": tag.name, "color": tag.color} for tag in unused_tags]
+    result = [{"id": tag.id, "name": tag.name, "color": tag.color} for tag in unused_tags]
+    _unused_tags_cache.set(version, result)
+    return result
 
 
 @router.delete("/unused")
@@ -101,18 +121,19 @@ async def rename_tag(tag_id: int, new_name: str, db: AsyncSession = Depends(get_
 @router.post("/regenerate-colors")
 async def regenerate_tag_colors(db: AsyncSession = Depends(get_db)):
     """Regenerate colors for all existing tags based on their names."""
-    from color_utils import generate_vibrant_color
-
     try:
-        result = await db.execute(select(Tag))
-        tags = result.scalars().all()
-
-        updated_count = 0
-        for tag in tags:
-            new_color = generate_vibrant_color(tag.name)
-            tag.color = new_color
-            updated_count += 1
-
+        result = await db.execute(select(Tag.id, Tag.name))
+
+        # Compute colors up front and write them back in one executemany
+        # UPDATE (bulk update by primary key) instead of dirtying every ORM row
+        mappings = [
+            {"id": tag_id, "color": generate_vibrant_color(name)}
+            for tag_id, name in result.all()
+        ]
+        updated_count = len(mappings)
+
+        if mappings:
+            await db.execute(update(Tag), mappings)
         await db.commit()
 
         return {
@@ -1,9 +1,7 @@
 """Thumbnail generation and management endpoints."""
 
+import asyncio
 import logging
-import subprocess
-import tempfile
-from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import Response
@@ -12,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db, Video
 from routers.roots import get_thumbnail_db
+from utils.ffmpeg import THUMBNAIL_FRAME_ARGS, format_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +26,13 @@ async def get_thumbnail(video_id: int, request: Request, db: AsyncSession = Depe
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
 
+    etag = f'"{video_id}-{int(video.modified)}"'
+
+    # Answer revalidations before touching the thumbnail BLOB
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
     thumbnail_data = await thumbnail_db.get_thumbnail_data(video.path)
     if not thumbnail_data:
         success = await thumbnail_db.generate_and_store_thumbnail(video.path)
@@ -39,12 +45,6 @@ async def get_thumbnail(video_id: int, request: Request, db: AsyncSession = Depe
             await db.commit()
             raise HTTPException(status_code=404, detail="Thumbnail not available")
 
-    etag = f'"{video_id}-{int(video.modified)}"'
-
-    if_none_match = request.headers.get("if-none-match")
-    if if_none_match == etag:
-        return Response(status_code=304, headers={"ETag": etag})
-
     headers = {
         "Cache-Control": "public, max-age=3600",
         "ETag": etag,
@@ -67,11 +67,7 @@ async def generate_thumbnail(video_id: int, request: Request, db: AsyncSession =
     try:
         body = await request.json()
         if "time" in body and isinstance(body["time"], (int, float)):
-            seconds = int(body["time"])
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            secs = seconds % 60
-            timestamp = f"{hours:02d}:{minutes:02d}:{secs:02d}"
+            timestamp = format_timestamp(body["time"])
     except:
         pass
 
@@ -100,66 +96,48 @@ async def generate_thumbnail_preview(video_id: int, time: int, db: AsyncSession
     if not thumbnail_db.ffmpeg_available:
         raise HTTPException(status_code=503, detail="FFmpeg not available")
 
-    hours = time // 3600
-    minutes = (time % 3600) // 60
-    secs = time % 60
-    timestamp = f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    cmd = (
+        'ffmpeg',
+        '-ss', format_timestamp(time),
+        '-i', str(video.path),
+        *THUMBNAIL_FRAME_ARGS,
+        'pipe:1'  # Write the JPEG to stdout, no temp file round trip
+    )
 
     try:
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-            temp_path = temp_file.name
-
-        cmd = [
-            'ffmpeg',
-            '-ss', timestamp,
-            '-i', str(video.path),
-            '-vframes', '1',
-            '-vf', 'scale=320:-1',
-            '-q:v', '2',
-            '-f', 'mjpeg',
-            '-threads', '1',
-            '-loglevel', 'error',
-            '-y',
-            temp_path
-        ]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=8
+        # Run ffmpeg without blocking the event loop for other requests
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
-
-        if result.returncode == 0 and Path(temp_path).exists():
-            with open(temp_path, 'rb') as f:
-                image_data = f.read()
-
-            Path(temp_path).unlink()
-
-            headers = {
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0"
-            }
-            return Response(content=image_data, media_type="image/jpeg", headers=headers)
-        else:
-            if Path(temp_path).exists():
-                Path(temp_path).unlink()
-            raise HTTPException(status_code=500, detail="Failed to generate preview")
-
+        try:
+            image_data, _ = await asyncio.wait_for(process.communicate(), timeout=8)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise RuntimeError("ffmpeg timed out")
     except Exception as e:
-        if 'temp_path' in locals() and Path(temp_path).exists():
-            Path(temp_path).unlink()
         raise HTTPException(status_code=500, detail=f"Preview generation failed: {str(e)}")
 
+    if process.returncode != 0 or not image_data:
+        raise HTTPException(status_code=500, detail="Failed to generate preview")
+
+    headers = {
+        "Cache-Control": "no-cache, no-store, must-revalidate",
+        "Pragma": "no-cache",
+        "Expires": "0"
+    }
+    return Response(content=image_data, media_type="image/jpeg", headers=headers)
+
 
 @router.post("/cleanup")
 async def cleanup_thumbnails(db: AsyncSession = Depends(get_db)):
     """Clean up orphaned thumbnails from database."""
     thumbnail_db = get_thumbnail_db()
 
-    result = await db.execute(select(Video.path))
-    valid_paths = set(result.scalars().all())
+    # Stream paths in batches instead of materializing every path string at once
+    valid_paths = await db.stream_scalars(select(Video.path).execution_options(yield_per=1000))
 
     removed_db = await thumbnail_db.cleanup_orphaned_thumbnails(valid_paths)
 
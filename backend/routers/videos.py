@@ -1,25 +1,30 @@
 """Video management endpoints."""
 
-import hashlib
+import asyncio
 import logging
 import os
 import time
+from collections import defaultdict
 from pathlib import Path
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request, Body
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, case, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
 from config import config
-from database import get_db, Video, FaceID, FaceEncoding, VideoFace
+from database import get_db, id_in, Video, FaceID, FaceEncoding, VideoFace
+from face_service import face_service
 from file_scanner import scanner
+from metadata_parser import parse_metadata_from_filename, should_update_field
 from video_service import VideoService
 from schemas.video import MoveVideoRequest, RenameVideoRequest, UpdateVideoRequest
 from schemas.face import LinkFaceToVideoRequest
 from schemas.common import BulkUpdateRequest
+from utils.constants import FFPROBE_CONCURRENCY
+from utils.hash_naming import hash_name_from_digest, hash_file_digest
 from utils.serializers import serialize_video
 from routers.roots import get_thumbnail_db
 
@@ -27,6 +32,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/videos", tags=["videos"])
 
+# Loader options for endpoints that serialize a single video with its tags/actors
+_TAGS_AND_ACTORS = [selectinload(Video.tags), selectinload(Video.actors)]
+
 
 def get_media_type_header(file_path: Path) -> str:
     """Get correct Content-Type header for file."""
@@ -104,12 +112,10 @@ async def get_video_by_id(video_id: int, db: AsyncSession = Depends(get_db)):
     thumbnail_db = get_thumbnail_db()
 
     try:
-        video = await db.get(Video, video_id)
+        video = await db.get(Video, video_id, options=_TAGS_AND_ACTORS)
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
 
-        await db.refresh(video, ["tags", "actors"])
-
         service = VideoService(db, thumbnail_db)
         faces_map = await service.get_faces_for_videos([video_id])
 
@@ -147,7 +153,7 @@ async def update_video_metadata(video_id: int, body: dict, db: AsyncSession = De
     thumbnail_db = get_thumbnail_db()
 
     try:
-        video = await db.get(Video, video_id)
+        video = await db.get(Video, video_id, options=_TAGS_AND_ACTORS)
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
 
@@ -161,7 +167,6 @@ async def update_video_metadata(video_id: int, body: dict, db: AsyncSession = De
                     setattr(video, field, value)
 
         await db.commit()
-        await db.refresh(video, ["tags", "actors"])
 
         service = VideoService(db, thumbnail_db)
         faces_map = await service.get_faces_for_videos([video_id])
@@ -184,36 +189,25 @@ async def hash_rename_video(video_id: int, db: AsyncSession = Depends(get_db)):
     thumbnail_db = get_thumbnail_db()
 
     try:
-        video = await db.get(Video, video_id)
+        video = await db.get(Video, video_id, options=_TAGS_AND_ACTORS)
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
 
         video_path = Path(video.path)
-        if not video_path.exists():
+        if not await asyncio.to_thread(video_path.exists):
             raise HTTPException(status_code=404, detail="Video file not found")
 
-        sha1_hash = hashlib.sha1()
-        with open(video_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                sha1_hash.update(chunk)
-
-        hash_str = sha1_hash.hexdigest()
-
-        part1 = hash_str[0:4]
-        part2 = hash_str[4:8]
-        part3 = hash_str[2] + hash_str[4] + hash_str[6] + hash_str[10]
-        part4 = hash_str[10] + hash_str[6] + hash_str[4] + hash_str[2]
+        hash_str = await asyncio.to_thread(hash_file_digest, video_path, sampled=config.sampled_rename_hash)
 
-        new_name_base = part1 + part2 + part3 + part4
+        new_name_base = hash_name_from_digest(hash_str)
         ext = video_path.suffix
         new_name = f"{new_name_base}{ext}"
 
         new_path = video_path.parent / new_name
-        if new_path.exists() and new_path != video_path:
+        if new_path != video_path and await asyncio.to_thread(new_path.exists):
             raise HTTPException(status_code=409, detail=f"Target name already exists: {new_name}")
 
         if video_path == new_path:
-            await db.refresh(video, ["tags", "actors"])
             service = VideoService(db, thumbnail_db)
             faces_map = await service.get_faces_for_videos([video_id])
             return {
@@ -222,7 +216,7 @@ async def hash_rename_video(video_id: int, db: AsyncSession = Depends(get_db)):
                 "video": serialize_video(video, faces_map)
             }
 
-        video_path.rename(new_path)
+        await asyncio.to_thread(video_path.rename, new_path)
 
         await thumbnail_db.update_path_hash(str(video_path), str(new_path))
 
@@ -233,7 +227,6 @@ async def hash_rename_video(video_id: int, db: AsyncSession = Depends(get_db)):
         video.thumbnail_url = f"/api/thumbnails/{video.id}"
 
         await db.commit()
-        await db.refresh(video, ["tags", "actors"])
 
         service = VideoService(db, thumbnail_db)
         faces_map = await service.get_faces_for_videos([video_id])
@@ -384,7 +377,8 @@ async def update_video(
                     target_category=video.category,
                     root_directory=config.root_directory,
                     target_subcategory=video.subcategory,
-                    new_name=body.new_name
+                    new_name=body.new_name,
+                    video=video
                 )
             except FileExistsError:
                 raise HTTPException(status_code=409, detail="A file with this name already exists")
@@ -395,13 +389,7 @@ async def update_video(
 
             if not video:
                 raise HTTPException(status_code=404, detail="Video not found or source file missing")
-
-            result = await db.execute(
-                select(Video)
-                .options(selectinload(Video.tags), selectinload(Video.actors))
-                .where(Video.id == video_id)
-            )
-            video = result.scalar_one_or_none()
+            # move_video returns the same identity-mapped instance, tags/actors still loaded
 
         if body.display_name is not None:
             video.display_name = body.display_name
@@ -422,8 +410,8 @@ async def update_video(
         if body.favorite is not None:
             video.favorite = 1 if body.favorite else 0
 
+        # expire_on_commit=False keeps the written values; no refresh SELECT needed
         await db.commit()
-        await db.refresh(video)
 
         return {
             "message": "Video updated successfully",
@@ -440,20 +428,20 @@ async def update_video(
 async def toggle_final_status(video_id: int, db: AsyncSession = Depends(get_db)):
     """Toggle the final/preferred status of a video (for deduplication workflow)."""
     try:
+        # Flip in SQL and get the row back in the same statement (SQLite >= 3.35)
         result = await db.execute(
-            select(Video)
-            .options(selectinload(Video.tags), selectinload(Video.actors))
+            update(Video)
             .where(Video.id == video_id)
+            .values(is_final=case((func.coalesce(Video.is_final, 0) == 0, 1), else_=0))
+            .returning(Video)
+            .options(selectinload(Video.tags), selectinload(Video.actors))
         )
         video = result.scalar_one_or_none()
 
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
 
-        video.is_final = 0 if video.is_final else 1
-
         await db.commit()
-        await db.refresh(video)
 
         return {
             "success": True,
@@ -476,52 +464,44 @@ async def parse_metadata_batch(
     db: AsyncSession = Depends(get_db)
 ):
     """Parse metadata from filenames for videos in a specific folder."""
-    from metadata_parser import parse_metadata_from_filename, should_update_field
-
     try:
-        query = select(Video)
+        # Only the columns the parser reads - no full ORM rows
+        metadata_fields = ('series', 'season', 'episode', 'year', 'channel')
+        query = select(Video.id, Video.name, *(getattr(Video, field) for field in metadata_fields))
 
         if category:
             query = query.where(Video.category == category)
         if subcategory:
             query = query.where(Video.subcategory == subcategory)
 
-        result = await db.execute(query)
-        videos = result.scalars().all()
+        # Stream the rows; only videos that actually change are kept in memory
+        result = await db.stream(query.execution_options(yield_per=1000))
 
-        updated_count = 0
-        skipped_count = 0
-
-        for video in videos:
+        # Changed fields per video, written back in one executemany UPDATE by primary key
+        changes = []
+        total_videos = 0
+        async for video in result:
+            total_videos += 1
             parsed = parse_metadata_from_filename(video.name)
-            has_updates = False
-
-            if should_update_field(video.series, parsed.get('series')):
-                video.series = parsed.get('series')
-                has_updates = True
-            if should_update_field(video.season, parsed.get('season')):
-                video.season = parsed.get('season')
-                has_updates = True
-            if should_update_field(video.episode, parsed.get('episode')):
-                video.episode = parsed.get('episode')
-                has_updates = True
-            if should_update_field(video.year, parsed.get('year')):
-                video.year = parsed.get('year')
-                has_updates = True
-            if should_update_field(video.channel, parsed.get('channel')):
-                video.channel = parsed.get('channel')
-                has_updates = True
-
-            if has_updates:
-                updated_count += 1
-            else:
-                skipped_count += 1
+            change = {
+                field: parsed.get(field)
+                for field in metadata_fields
+                if should_update_field(getattr(video, field), parsed.get(field))
+            }
+            if change:
+                change['id'] = video.id
+                changes.append(change)
 
-        await db.commit()
+        if changes:
+            await db.execute(update(Video), changes)
+            await db.commit()
+
+        updated_count = len(changes)
+        skipped_count = total_videos - updated_count
 
         return {
             "message": "Metadata parsing complete",
-            "total_videos": len(videos),
+            "total_videos": total_videos,
             "updated": updated_count,
             "skipped": skipped_count,
             "category": category,
@@ -546,67 +526,71 @@ async def bulk_update_videos(
         updated_videos = []
         failed_videos = []
 
-        for video_update in body.videos:
-            video_id = video_update.get('id')
-            if not video_id:
-                continue
+        # Prefetch every target video (with tags/actors for the response) in one query
+        video_updates = [v for v in body.videos if v.get('id')]
+        result = await db.execute(
+            select(Video).options(
+                selectinload(Video.tags),
+                selectinload(Video.actors)
+            ).where(Video.id.in_([v['id'] for v in video_updates]))
+        )
+        videos_by_id = {video.id: video for video in result.scalars().all()}
 
-            try:
-                result = await db.execute(
-                    select(Video).options(
-                        selectinload(Video.tags),
-                        selectinload(Video.actors)
-                    ).where(Video.id == video_id)
-                )
-                video = result.scalar_one_or_none()
+        # Renames first: move_video commits on its own, so run them before any
+        # field changes are pending in the session
+        pending = []
+        for video_update in video_updates:
+            video_id = video_update['id']
+            video = videos_by_id.get(video_id)
 
-                if not video:
-                    failed_videos.append({"id": video_id, "error": "Video not found"})
+            if not video:
+                failed_videos.append({"id": video_id, "error": "Video not found"})
+                continue
+
+            new_name = video_update.get('new_name')
+            if new_name:
+                try:
+                    await service.move_video(
+                        video_id=video_id,
+                        target_category=video.category,
+                        root_directory=config.root_directory,
+                        target_subcategory=video.subcategory,
+                        new_name=new_name,
+                        video=video
+                    )
+                except (FileExistsError, ValueError, RuntimeError) as e:
+                    failed_videos.append({"id": video_id, "error": str(e)})
+                    continue
+                except Exception as e:
+                    logger.error(f"Error updating video {video_id}: {str(e)}", exc_info=True)
+                    failed_videos.append({"id": video_id, "error": str(e)})
                     continue
 
-                new_name = video_update.get('new_name')
-                if new_name:
-                    try:
-                        video = await service.move_video(
-                            video_id=video_id,
-                            target_category=video.category,
-                            root_directory=config.root_directory,
-                            target_subcategory=video.subcategory,
-                            new_name=new_name
-                        )
-                        result = await db.execute(
-                            select(Video).options(
-                                selectinload(Video.tags),
-                                selectinload(Video.actors)
-                            ).where(Video.id == video_id)
-                        )
-                        video = result.scalar_one_or_none()
-                    except (FileExistsError, ValueError, RuntimeError) as e:
-                        failed_videos.append({"id": video_id, "error": str(e)})
-                        continue
+            pending.append((video, video_update))
 
-                for field, value in body.common_fields.items():
-                    if value is not None and hasattr(video, field):
-                        if field == 'favorite':
-                            setattr(video, field, 1 if value else 0)
-                        else:
-                            setattr(video, field, value)
+        # Apply common fields + per-video overrides in memory, then commit once
+        for video, video_update in pending:
+            for field, value in body.common_fields.items():
+                if value is not None and hasattr(video, field):
+                    if field == 'favorite':
+                        setattr(video, field, 1 if value else 0)
+                    else:
+                        setattr(video, field, value)
 
-                for field, value in video_update.items():
-                    if field not in ['id', 'new_name'] and value is not None and hasattr(video, field):
-                        if field == 'favorite':
-                            setattr(video, field, 1 if value else 0)
-                        else:
-                            setattr(video, field, value)
+            for field, value in video_update.items():
+                if field not in ['id', 'new_name'] and value is not None and hasattr(video, field):
+                    if field == 'favorite':
+                        setattr(video, field, 1 if value else 0)
+                    else:
+                        setattr(video, field, value)
 
-                await db.commit()
-                await db.refresh(video)
-                updated_videos.append(video)
+            updated_videos.append(video)
 
-            except Exception as e:
-                logger.error(f"Error updating video {video_id}: {str(e)}", exc_info=True)
-                failed_videos.append({"id": video_id, "error": str(e)})
-                continue
+        try:
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
 
         return {
             "message": "Bulk update complete",
@@ -671,17 +655,59 @@ async def extract_video_metadata(video_id: int, db: AsyncSession = Depends(get_d
         raise HTTPException(status_code=500, detail=f"Metadata extraction failed: {str(e)}")
 
 
+async def _extract_missing_metadata(service: VideoService, videos) -> tuple[int, int]:
+    """Run ffprobe for the given videos, up to FFPROBE_CONCURRENCY at a time.
+
+    Callers select only videos still missing a duration (duration IS NULL).
+
+    Only the ffprobe subprocesses run concurrently; results are applied to the
+    ORM objects afterwards in this task (the session is never shared).
+
+    Returns:
+        (processed, failed) counts
+    """
+    semaphore = asyncio.Semaphore(FFPROBE_CONCURRENCY)
+
+    async def probe(video_path: Path):
+        async with semaphore:
+            # stat() can block for a long time on network shares - keep it off the loop
+            if not await asyncio.to_thread(video_path.exists):
+                raise FileNotFoundError(f"File not found: {video_path}")
+            return await service.extract_video_metadata(video_path)
+
+    results = await asyncio.gather(
+        *(probe(Path(video.path)) for video in videos),
+        return_exceptions=True
+    )
+
+    processed = 0
+    failed = 0
+    for video, metadata in zip(videos, results):
+        if isinstance(metadata, Exception):
+            logger.warning(f"Failed to extract metadata for {video.name}: {metadata}")
+            failed += 1
+        elif metadata:
+            video.duration = metadata.get('duration')
+            video.width = metadata.get('width')
+            video.height = metadata.get('height')
+            video.codec = metadata.get('codec')
+            video.bitrate = metadata.get('bitrate')
+            video.fps = metadata.get('fps')
+            processed += 1
+
+    return processed, failed
+
+
 @router.post("/folder/{folder_name}/extract-metadata")
 async def extract_folder_metadata(folder_name: str, db: AsyncSession = Depends(get_db)):
     """Extract metadata for all videos in a folder."""
     thumbnail_db = get_thumbnail_db()
 
-    result = await db.execute(
-        select(Video).where(Video.category == folder_name)
+    total_videos = await db.scalar(
+        select(func.count(Video.id)).where(Video.category == folder_name)
     )
-    videos = result.scalars().all()
 
-    if not videos:
+    if not total_videos:
         return {
             "success": True,
             "folder_name": folder_name,
@@ -689,41 +715,20 @@ async def extract_folder_metadata(folder_name: str, db: AsyncSession = Depends(g
             "message": "No videos found in folder"
         }
 
-    service = VideoService(db, thumbnail_db)
-    processed = 0
-    failed = 0
-
-    for video in videos:
-        if video.duration is not None:
-            continue
-
-        video_path = Path(video.path)
-        if not video_path.exists():
-            failed += 1
-            continue
+    result = await db.execute(
+        select(Video).where(Video.category == folder_name, Video.duration.is_(None))
+    )
+    videos = result.scalars().all()
 
-        try:
-            metadata = await service.extract_video_metadata(video_path)
-
-            if metadata:
-                video.duration = metadata.get('duration')
-                video.width = metadata.get('width')
-                video.height = metadata.get('height')
-                video.codec = metadata.get('codec')
-                video.bitrate = metadata.get('bitrate')
-                video.fps = metadata.get('fps')
-                processed += 1
-        except Exception as e:
-            logger.warning(f"Failed to extract metadata for {video.name}: {e}")
-            failed += 1
-            continue
+    service = VideoService(db, thumbnail_db)
+    processed, failed = await _extract_missing_metadata(service, videos)
 
     await db.commit()
 
     return {
         "success": True,
         "folder_name": folder_name,
-        "total_videos": len(videos),
+        "total_videos": total_videos,
         "processed": processed,
         "failed": failed,
         "message": f"Extracted metadata for {processed} videos"
@@ -738,49 +743,27 @@ async def extract_bulk_metadata(video_ids: List[int], db: AsyncSession = Depends
     if not video_ids:
         raise HTTPException(status_code=400, detail="No video IDs provided")
 
-    result = await db.execute(
-        select(Video).where(Video.id.in_(video_ids))
+    found = await db.scalar(
+        select(func.count(Video.id)).where(Video.id.in_(video_ids))
     )
-    videos = result.scalars().all()
 
-    if not videos:
+    if not found:
         raise HTTPException(status_code=404, detail="No videos found")
 
-    service = VideoService(db, thumbnail_db)
-    processed = 0
-    failed = 0
-
-    for video in videos:
-        if video.duration is not None:
-            continue
-
-        video_path = Path(video.path)
-        if not video_path.exists():
-            failed += 1
-            continue
+    result = await db.execute(
+        select(Video).where(Video.id.in_(video_ids), Video.duration.is_(None))
+    )
+    videos = result.scalars().all()
 
-        try:
-            metadata = await service.extract_video_metadata(video_path)
-
-            if metadata:
-                video.duration = metadata.get('duration')
-                video.width = metadata.get('width')
-                video.height = metadata.get('height')
-                video.codec = metadata.get('codec')
-                video.bitrate = metadata.get('bitrate')
-                video.fps = metadata.get('fps')
-                processed += 1
-        except Exception as e:
-            logger.warning(f"Failed to extract metadata for {video.name}: {e}")
-            failed += 1
-            continue
+    service = VideoService(db, thumbnail_db)
+    processed, failed = await _extract_missing_metadata(service, videos)
 
     await db.commit()
 
     return {
         "success": True,
         "requested": len(video_ids),
-        "found": len(videos),
+        "found": found,
         "processed": processed,
         "failed": failed,
         "message": f"Extracted metadata for {processed} videos"
@@ -849,10 +832,11 @@ async def delete_video_permanent(video_id: int, db: AsyncSession = Depends(get_d
 
     try:
         video_path = Path(video.path)
-        if video_path.exists():
-            os.remove(video_path)
+        # Unlinking a large file can take a while on slow disks - keep it off the event loop
+        try:
+            await asyncio.to_thread(os.remove, video_path)
             logger.info(f"Permanently deleted file: {video_path}")
-        else:
+        except FileNotFoundError:
             logger.warning(f"File not found for deletion: {video_path}")
 
         await db.delete(video)
@@ -873,8 +857,6 @@ async def delete_video_permanent(video_id: int, db: AsyncSession = Depends(get_d
 @router.get("/metadata/suggestions")
 async def get_metadata_suggestions(field: str = None, db: AsyncSession = Depends(get_db)):
     """Get unique values for metadata fields (series, channel, year) for autocomplete with counts."""
-    from sqlalchemy import func
-
     try:
         if field == "channel":
             result = await db.execute(
@@ -1008,52 +990,64 @@ async def get_video_faces(video_id: int, db: AsyncSession = Depends(get_db)):
             raise HTTPException(status_code=404, detail=f"Video {video_id} not found")
 
         video_faces_result = await db.execute(
-            select(VideoFace, FaceID, FaceEncoding)
+            select(VideoFace, FaceID)
             .join(FaceID, VideoFace.face_id == FaceID.id)
-            .outerjoin(
-                FaceEncoding,
-                and_(
-                    FaceEncoding.face_id == FaceID.id,
-                    FaceEncoding.video_id == video_id
-                )
-            )
             .where(VideoFace.video_id == video_id)
             .order_by(VideoFace.first_detected_at.desc())
         )
 
         results = video_faces_result.all()
+        face_ids = [face.id for _, face in results]
+
+        # Up to 200 best encodings per face in one windowed query; thumbnails
+        # only, the embedding bytes are not needed here
+        encodings_by_face = defaultdict(list)
+        if face_ids:
+            ranked = (
+                select(
+                    FaceEncoding.id,
+                    FaceEncoding.face_id,
+                    FaceEncoding.thumbnail,
+                    FaceEncoding.quality_score,
+                    func.row_number().over(
+                        partition_by=FaceEncoding.face_id,
+                        order_by=(FaceEncoding.quality_score.desc(), FaceEncoding.id)
+                    ).label('rank')
+                )
+                .where(id_in(FaceEncoding.face_id, face_ids))
+                .subquery()
+            )
+            encodings_result = await db.execute(
+                select(ranked.c.id, ranked.c.face_id, ranked.c.thumbnail, ranked.c.quality_score)
+                .where(ranked.c.rank <= 200)
+                .order_by(ranked.c.face_id, ranked.c.rank)
+            )
+            for enc in encodings_result.all():
+                encodings_by_face[enc.face_id].append(enc)
+
+        primary_ids = [face.primary_encoding_id for _, face in results if face.primary_encoding_id]
+        primary_thumbnails = {}
+        if primary_ids:
+            primary_result = await db.execute(
+                select(FaceEncoding.id, FaceEncoding.thumbnail).where(id_in(FaceEncoding.id, primary_ids))
+            )
+            primary_thumbnails = dict(primary_result.all())
 
         faces_dict = {}
-        for video_face, face, encoding in results:
+        for video_face, face in results:
             if face.id not in faces_dict:
+                all_encodings = encodings_by_face[face.id]
+                # The user-selected primary, else the best-quality encoding
                 if face.primary_encoding_id:
-                    best_encoding_result = await db.execute(
-                        select(FaceEncoding)
-                        .where(FaceEncoding.id == face.primary_encoding_id)
-                    )
-                    best_encoding = best_encoding_result.scalar_one_or_none()
+                    best_thumbnail = primary_thumbnails.get(face.primary_encoding_id)
                 else:
-                    best_encoding_result = await db.execute(
-                        select(FaceEncoding)
-                        .where(FaceEncoding.face_id == face.id)
-                        .order_by(FaceEncoding.quality_score.desc())
-                        .limit(1)
-                    )
-                    best_encoding = best_encoding_result.scalar_one_or_none()
-
-                all_encodings_result = await db.execute(
-                    select(FaceEncoding)
-                    .where(FaceEncoding.face_id == face.id)
-                    .order_by(FaceEncoding.quality_score.desc())
-                    .limit(200)
-                )
-                all_encodings = all_encodings_result.scalars().all()
+                    best_thumbnail = all_encodings[0].thumbnail if all_encodings else None
 
                 faces_dict[face.id] = {
                     "id": face.id,
                     "name": face.name,
                     "actor_id": face.actor_id,
-                    "thumbnail": best_encoding.thumbnail if best_encoding else None,
+                    "thumbnail": best_thumbnail,
                     "embeddings": [
                         {
                             "id": enc.id,
@@ -1232,7 +1226,6 @@ async def detect_faces_for_review(
                 detail=f"Video file not found at {video_path}"
             )
 
-        from face_service import face_service
         logger.info(f"Starting face detection for review on video {video_id}: {video.name}")
         detection_result = await face_service.detect_faces_for_review(
             db,
@@ -1294,7 +1287,6 @@ async def add_detected_faces(
                 'message': 'No faces selected to add'
             }
 
-        from face_service import face_service
         logger.info(f"Adding {len(detected_faces)} selected faces to video {video_id}")
 
         face_ids_created = set()
@@ -1435,7 +1427,6 @@ async def auto_scan_faces(
                 detail=f"Video file not found at {video_path}"
             )
 
-        from face_service import face_service
         logger.info(f"Starting auto-scan for video {video_id}: {video.name}")
         scan_result = await face_service.auto_scan_faces(
             db,
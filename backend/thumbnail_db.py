@@ -1,13 +1,20 @@
-from sqlalchemy import Column, Integer, String, LargeBinary, Float, create_engine, select
+from sqlalchemy import Column, Integer, String, LargeBinary, Float, create_engine, select, update, delete, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from pathlib import Path
 import hashlib
+import json
 import subprocess
+import tempfile
 import logging
 from typing import Optional
 import time
 
+from utils.constants import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
+from utils.ffmpeg import THUMBNAIL_FRAME_ARGS
+
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
@@ -23,6 +30,17 @@ class Thumbnail(Base):
     width = Column(Integer, default=320)
     height = Column(Integer, default=180)
 
+class ProbeResult(Base):
+    """Cached ffprobe metadata, valid while the file's mtime and size are unchanged"""
+    __tablename__ = "probe_results"
+
+    id = Column(Integer, primary_key=True)
+    video_path_hash = Column(String, unique=True, nullable=False)  # MD5 of video path
+    mtime_ns = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=False)
+    metadata_json = Column(String, nullable=False)
+    created_at = Column(Float, nullable=False)  # Unix timestamp
+
 class ThumbnailDatabase:
     def __init__(self, db_path: str = "thumbnails.db"):
         self.db_path = Path(db_path)
@@ -30,7 +48,14 @@ class ThumbnailDatabase:
 
         # Create separate engine for thumbnails
         self.database_url = f"sqlite+aiosqlite:///{self.db_path}"
-        self.engine = create_async_engine(self.database_url, echo=False)
+        self.engine = create_async_engine(
+            self.database_url,
+            echo=False,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT
+        )
         self.SessionLocal = async_sessionmaker(self.engine, expire_on_commit=False)
 
         # Check FFmpeg availability
@@ -60,13 +85,19 @@ class ThumbnailDatabase:
 
         async with self.SessionLocal() as session:
             result = await session.execute(
-                select(Thumbnail).where(Thumbnail.video_path_hash == path_hash)
+                select(Thumbnail.image_data).where(Thumbnail.video_path_hash == path_hash)
             )
-            thumbnail = result.scalar_one_or_none()
+            return result.scalar_one_or_none()
 
-            if thumbnail:
-                return thumbnail.image_data
-            return None
+    async def has_thumbnail(self, video_path: str) -> bool:
+        """Check whether a thumbnail exists without loading its binary data"""
+        path_hash = self._get_path_hash(video_path)
+
+        async with self.SessionLocal() as session:
+            result = await session.execute(
+                select(Thumbnail.id).where(Thumbnail.video_path_hash == path_hash)
+            )
+            return result.scalar_one_or_none() is not None
 
     async def store_thumbnail(self, video_path: str, image_data: bytes) -> bool:
         """Store thumbnail binary data in database"""
@@ -127,12 +158,11 @@ class ThumbnailDatabase:
             return await self.store_image_thumbnail(video_path)
 
         # Check if already exists (unless forced to regenerate)
-        if not force_regenerate and await self.get_thumbnail_data(video_path):
+        if not force_regenerate and await self.has_thumbnail(video_path):
             return True
 
         try:
             # Generate thumbnail to temporary location
-            import tempfile
             with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
                 temp_path = temp_file.name
 
@@ -141,12 +171,7 @@ class ThumbnailDatabase:
                 'ffmpeg',
                 '-ss', timestamp,  # Seek before input for much faster seeking
                 '-i', str(video_path),
-                '-vframes', '1',
-                '-vf', 'scale=320:-1',  # Preserve aspect ratio (320px width, auto height)
-                '-q:v', '2',  # Better quality, small size increase
-                '-f', 'mjpeg',  # Explicit format
-                '-threads', '1',  # Single thread for predictable performance
-                '-loglevel', 'error',  # Reduce log verbosity
+                *THUMBNAIL_FRAME_ARGS,
                 '-y',
                 temp_path
             ]
@@ -269,23 +294,90 @@ class ThumbnailDatabase:
                 return True
             return False
 
-    async def cleanup_orphaned_thumbnails(self, valid_video_paths: set) -> int:
-        """Remove thumbnails for videos that no longer exist"""
-        valid_hashes = {self._get_path_hash(path) for path in valid_video_paths}
+    async def cleanup_orphaned_thumbnails(self, valid_video_paths) -> int:
+        """Remove thumbnails (and cached probe results) for videos that no longer exist
+
+        Args:
+            valid_video_paths: Set/iterable or async iterable of current video paths.
+                Only their hashes are kept, so paths can be streamed straight from a query.
+        """
+        if hasattr(valid_video_paths, '__aiter__'):
+            valid_hashes = {self._get_path_hash(path) async for path in valid_video_paths}
+        else:
+            valid_hashes = {self._get_path_hash(path) for path in valid_video_paths}
 
         async with self.SessionLocal() as session:
-            # Get all thumbnail hashes
-            result = await session.execute(select(Thumbnail))
-            all_thumbnails = result.scalars().all()
+            # Only id + hash - never load the image BLOBs just to compare keys
+            result = await session.execute(select(Thumbnail.id, Thumbnail.video_path_hash))
+            orphan_ids = [
+                thumbnail_id for thumbnail_id, path_hash in result.all()
+                if path_hash not in valid_hashes
+            ]
 
-            removed_count = 0
-            for thumbnail in all_thumbnails:
-                if thumbnail.video_path_hash not in valid_hashes:
-                    await session.delete(thumbnail)
-                    removed_count += 1
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(orphan_ids), 500):
+                await session.execute(
+                    delete(Thumbnail).where(Thumbnail.id.in_(orphan_ids[start:start + 500]))
+                )
+
+            # Cached probe results for the same vanished paths
+            result = await session.execute(select(ProbeResult.id, ProbeResult.video_path_hash))
+            orphan_probe_ids = [
+                probe_id for probe_id, path_hash in result.all()
+                if path_hash not in valid_hashes
+            ]
+            for start in range(0, len(orphan_probe_ids), 500):
+                await session.execute(
+                    delete(ProbeResult).where(ProbeResult.id.in_(orphan_probe_ids[start:start + 500]))
+                )
 
             await session.commit()
-            return removed_count
+            return len(orphan_ids)
+
+    async def get_probe_result(self, video_path: str, mtime_ns: int, size: int) -> Optional[dict]:
+        """Cached ffprobe metadata for a file, or None if missing or the file changed since"""
+        path_hash = self._get_path_hash(video_path)
+
+        try:
+            async with self.SessionLocal() as session:
+                result = await session.execute(
+                    select(ProbeResult.metadata_json).where(
+                        ProbeResult.video_path_hash == path_hash,
+                        ProbeResult.mtime_ns == mtime_ns,
+                        ProbeResult.size == size
+                    )
+                )
+                metadata_json = result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"Probe cache lookup failed for {video_path}: {e}")
+            return None
+
+        return json.loads(metadata_json) if metadata_json is not None else None
+
+    async def store_probe_result(self, video_path: str, mtime_ns: int, size: int, metadata: dict) -> bool:
+        """Cache ffprobe metadata for a file at its current mtime/size (replaces any older entry)"""
+        values = {
+            "video_path_hash": self._get_path_hash(video_path),
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "metadata_json": json.dumps(metadata),
+            "created_at": time.time()
+        }
+
+        try:
+            async with self.SessionLocal() as session:
+                stmt = sqlite_insert(ProbeResult).values(**values)
+                await session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[ProbeResult.video_path_hash],
+                        set_={key: stmt.excluded[key] for key in ("mtime_ns", "size", "metadata_json", "created_at")}
+                    )
+                )
+                await session.commit()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to cache probe result for {video_path}: {e}")
+            return False
 
     async def get_cache_stats(self) -> tuple[int, int]:
         """Get thumbnail cache statistics (count, total size in MB)"""
@@ -326,4 +418,34 @@ class ThumbnailDatabase:
                 return True
             else:
                 logger.warning(f"⚠️ No thumbnail found for old path: {old_path}")
-                return False
\ No newline at end of file
+                return False
+
+    async def update_path_hashes(self, path_pairs: list[tuple[str, str]]) -> int:
+        """Bulk variant of update_path_hash for many moved/renamed videos
+
+        Args:
+            path_pairs: List of (old_path, new_path) tuples
+
+        Returns:
+            Number of thumbnails that were found and updated
+        """
+        if not path_pairs:
+            return 0
+
+        params = [
+            {"old_hash": self._get_path_hash(old_path), "new_hash": self._get_path_hash(new_path)}
+            for old_path, new_path in path_pairs
+        ]
+
+        async with self.SessionLocal() as session:
+            # Single executemany UPDATE instead of a SELECT + UPDATE per thumbnail
+            result = await session.execute(
+                update(Thumbnail.__table__)
+                .where(Thumbnail.__table__.c.video_path_hash == bindparam("old_hash"))
+                .values(video_path_hash=bindparam("new_hash")),
+                params
+            )
+            await session.commit()
+
+        logger.info(f"✅ Updated {result.rowcount} of {len(params)} thumbnail hashes")
+        return result.rowcount
@@ -23,8 +23,10 @@ from .exceptions import (
     FFmpegNotAvailableError,
     FolderNotFoundError,
 )
-from .ffmpeg import check_ffmpeg, get_ffmpeg_version
+from .ffmpeg import check_ffmpeg, get_ffmpeg_version, format_timestamp
+from .hash_naming import hash_name_from_digest, hash_file_digest
 from .serializers import serialize_video
+from .versioned_cache import VersionedCache
 
 __all__ = [
     # Constants
@@ -51,6 +53,12 @@ __all__ = [
     # FFmpeg
     "check_ffmpeg",
     "get_ffmpeg_version",
+    "format_timestamp",
+    # Hash naming
+    "hash_name_from_digest",
+    "hash_file_digest",
     # Serializers
     "serialize_video",
+    # Caching
+    "VersionedCache",
 ]
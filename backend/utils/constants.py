@@ -65,9 +65,28 @@ FFMPEG_TIMEOUT = 15
 # FFprobe metadata extraction timeout
 FFPROBE_TIMEOUT = 10
 
+# Concurrent ffprobe processes for folder/bulk metadata extraction
+FFPROBE_CONCURRENCY = 8
+
+# Files hashed in parallel (worker threads) during bulk hash renames
+FILE_HASH_CONCURRENCY = 4
+
 # Video processing job timeout (10 minutes)
 VIDEO_PROCESSING_TIMEOUT = 600
 
+# =============================================================================
+# Database Connection Pool Constants
+# =============================================================================
+
+# Connections kept open per SQLite database (aiosqlite otherwise opens one per session)
+DB_POOL_SIZE = 5
+
+# Extra connections allowed during bursts
+DB_MAX_OVERFLOW = 10
+
+# Seconds to wait for a free connection before failing
+DB_POOL_TIMEOUT = 30
+
 # =============================================================================
 # Pagination Constants
 # =============================================================================
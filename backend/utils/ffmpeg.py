@@ -6,6 +6,16 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Output arguments for a single-frame JPEG thumbnail, shared by every extraction
+THUMBNAIL_FRAME_ARGS = (
+    '-vframes', '1',
+    '-vf', 'scale=320:-1',  # Preserve aspect ratio (320px width, auto height)
+    '-q:v', '2',  # Better quality, small size increase
+    '-f', 'mjpeg',  # Explicit format
+    '-threads', '1',  # Single thread for predictable performance
+    '-loglevel', 'error',  # Reduce log verbosity
+)
+
 # Cached FFmpeg availability status
 _ffmpeg_available: Optional[bool] = None
 _ffmpeg_version: Optional[str] = None
@@ -89,6 +99,21 @@ def get_ffmpeg_version() -> Optional[str]:
     return _ffmpeg_version
 
 
+def format_timestamp(seconds: int) -> str:
+    """
+    Format a position in whole seconds as an FFmpeg HH:MM:SS timestamp.
+
+    Args:
+        seconds: Position in the video
+
+    Returns:
+        Timestamp string, e.g. "01:02:03"
+    """
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
 def check_ffprobe() -> bool:
     """
     Check if FFprobe is available on the system.
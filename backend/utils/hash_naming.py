@@ -0,0 +1,60 @@
+"""Hash-based ("zindex") file naming helpers."""
+
+import hashlib
+import operator
+from pathlib import Path
+
+# Hex digest positions that make up a hash name:
+# digest[0:4] + digest[4:8] + digest[2,4,6,10] + digest[10,6,4,2]
+HASH_NAME_POSITIONS = (0, 1, 2, 3, 4, 5, 6, 7, 2, 4, 6, 10, 10, 6, 4, 2)
+
+_pick_hash_name_chars = operator.itemgetter(*HASH_NAME_POSITIONS)
+
+# Read size for full-content hashing, and window size for sampled hashing
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_SAMPLE_WINDOW = 1024 * 1024
+
+
+def hash_name_from_digest(hash_str: str) -> str:
+    """
+    Build the 16-character base file name from a hex digest.
+
+    Args:
+        hash_str: Hex digest of the file contents (e.g. SHA-1 hexdigest)
+
+    Returns:
+        File name without extension
+    """
+    return ''.join(_pick_hash_name_chars(hash_str))
+
+
+def hash_file_digest(file_path: Path, sampled: bool = False) -> str:
+    """
+    SHA-1 hex digest of a file, used to derive its hash name.
+
+    Sampled mode reads only three windows (head, middle, tail) plus the file
+    size, so cost no longer grows with file size. It identifies a file rather
+    than proving its content: edits outside the windows that keep the size
+    unchanged go unnoticed, and the digests differ from full-content ones.
+
+    Args:
+        file_path: File to hash
+        sampled: Hash head/middle/tail windows instead of every byte
+
+    Returns:
+        Hex digest string
+    """
+    sha1_hash = hashlib.sha1()
+    size = file_path.stat().st_size
+
+    with open(file_path, 'rb') as f:
+        if sampled and size > 3 * HASH_SAMPLE_WINDOW:
+            sha1_hash.update(str(size).encode())
+            for offset in (0, size // 2 - HASH_SAMPLE_WINDOW // 2, size - HASH_SAMPLE_WINDOW):
+                f.seek(offset)
+                sha1_hash.update(f.read(HASH_SAMPLE_WINDOW))
+        else:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha1_hash.update(chunk)
+
+    return sha1_hash.hexdigest()
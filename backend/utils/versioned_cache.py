@@ -0,0 +1,71 @@
+"""In-process cache for read-mostly listings, invalidated by a data version counter."""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class VersionedCache:
+    """
+    Holds results computed at a given data version.
+
+    Every entry is dropped as soon as the version moves on, so callers only
+    need a monotonic counter that is bumped on writes (see
+    database.get_data_version) - no TTLs or per-key invalidation.
+
+    With max_entries set, the least recently used entry is evicted once the
+    limit is reached, for caches keyed by an unbounded id space. max_bytes
+    does the same against the summed len() of the values (e.g. serialized
+    response bodies); a single value larger than the budget is not stored.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self._version: Optional[int] = None
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+
+    @property
+    def _bounded(self) -> bool:
+        return self._max_entries is not None or self._max_bytes is not None
+
+    def get(self, version: int, key: Hashable = None) -> Any:
+        """Return the cached value for key, or None if missing or stale."""
+        if version != self._version:
+            return None
+        value = self._entries.get(key)
+        if value is not None and self._bounded:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, version: int, value: Any, key: Hashable = None) -> None:
+        """
+        Store a value computed at the given version.
+
+        Pass the version read *before* querying: if a write landed meanwhile,
+        the value is filed under the old version and never served.
+        """
+        if self._version is not None and version < self._version:
+            return
+        if version != self._version:
+            self._version = version
+            self._entries = OrderedDict()
+            self._total_bytes = 0
+        if self._max_bytes is not None:
+            if len(value) > self._max_bytes:
+                return
+            if key in self._entries:
+                self._total_bytes -= len(self._entries[key])
+            self._total_bytes += len(value)
+        self._entries[key] = value
+        if self._bounded:
+            self._entries.move_to_end(key)
+            while self._over_limit():
+                _, evicted = self._entries.popitem(last=False)
+                if self._max_bytes is not None:
+                    self._total_bytes -= len(evicted)
+
+    def _over_limit(self) -> bool:
+        if self._max_entries is not None and len(self._entries) > self._max_entries:
+            return True
+        return self._max_bytes is not None and self._total_bytes > self._max_bytes
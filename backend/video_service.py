@@ -1,22 +1,44 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, func
 from sqlalchemy.orm import selectinload
-from database import Video, Tag, Actor, Category
+from database import Video, Tag, Actor, Category, FolderScanStatus, VideoFace, FaceID, FaceEncoding
+from color_utils import generate_vibrant_color
+from utils.constants import FFPROBE_TIMEOUT
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 import os
 import asyncio
 import json
+import logging
+import cv2
+
+logger = logging.getLogger(__name__)
+
 class VideoService:
     def __init__(self, db: AsyncSession, thumbnail_db=None):
         self.db = db
         self.thumbnail_db = thumbnail_db
 
     async def extract_video_metadata(self, video_path: Path) -> Optional[Dict[str, Any]]:
-        """Extract video metadata using ffprobe (duration, resolution, codec, bitrate, fps)"""
+        """Extract video metadata using ffprobe (duration, resolution, codec, bitrate, fps)
+
+        With a thumbnail DB, results are cached per file and reused while the
+        file's mtime and size are unchanged, so re-extracting skips ffprobe.
+        """
+        stat = None
+        if self.thumbnail_db:
+            try:
+                stat = await asyncio.to_thread(video_path.stat)
+            except OSError:
+                stat = None
+            else:
+                cached = await self.thumbnail_db.get_probe_result(str(video_path), stat.st_mtime_ns, stat.st_size)
+                if cached is not None:
+                    return cached
+
         try:
             cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
+                'ffprobe', '-v', 'error', '-print_format', 'json',
                 '-show_format', '-show_streams', str(video_path)
             ]
 
@@ -26,13 +48,20 @@ class VideoService:
                 stderr=asyncio.subprocess.PIPE
             )
 
-            stdout, stderr = await proc.communicate()
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=FFPROBE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # A stuck probe would otherwise hold its concurrency slot forever
+                proc.kill()
+                await proc.wait()
+                print(f"⚠️ ffprobe timed out after {FFPROBE_TIMEOUT}s for {video_path}")
+                return None
 
             if proc.returncode != 0:
-                print(f"⚠️ ffprobe failed for {video_path}: {stderr.decode()}")
+                print(f"⚠️ ffprobe failed for {video_path}: {stderr.decode(errors='replace').strip()}")
                 return None
 
-            data = json.loads(stdout.decode())
+            data = json.loads(stdout)
 
             # Find video stream
             video_stream = next(
@@ -61,6 +90,9 @@ class VideoService:
             else:
                 metadata['fps'] = None
 
+            if stat is not None:
+                await self.thumbnail_db.store_probe_result(str(video_path), stat.st_mtime_ns, stat.st_size, metadata)
+
             return metadata
 
         except FileNotFoundError:
@@ -142,7 +174,6 @@ class VideoService:
         # Extract image dimensions for images - ✅ NEW
         if not skip_generation and media_type == 'image' and video.width is None:
             try:
-                import cv2
                 img = cv2.imread(video.path)
                 if img is not None:
                     height, width = img.shape[:2]
@@ -328,7 +359,6 @@ class VideoService:
         if not tag:
             # Auto-generate color from tag name if not provided
             if color is None:
-                from color_utils import generate_vibrant_color
                 color = generate_vibrant_color(tag_name)
 
             tag = Tag(name=tag_name.lower(), color=color)
@@ -399,9 +429,7 @@ class VideoService:
             List of unused tags
         """
         # Get all tags with their video count
-        from sqlalchemy import func, select as sa_select
-
-        stmt = sa_select(Tag).outerjoin(Tag.videos).group_by(Tag.id).having(func.count(Video.id) == 0)
+        stmt = select(Tag).outerjoin(Tag.videos).group_by(Tag.id).having(func.count(Video.id) == 0)
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
@@ -510,7 +538,7 @@ class VideoService:
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
-    async def move_video(self, video_id: int, target_category: str, root_directory: Path, target_subcategory: str = None, new_name: Optional[str] = None) -> Optional[Video]:
+    async def move_video(self, video_id: int, target_category: str, root_directory: Path, target_subcategory: str = None, new_name: Optional[str] = None, video: Optional[Video] = None) -> Optional[Video]:
         """Move a video file to another category/subcategory and update DB.
 
         Rules:
@@ -520,17 +548,21 @@ class VideoService:
         - new_name (if provided) must retain original extension unless explicitly includes another extension.
         - Fails if destination already exists.
         - If filesystem move succeeds but DB update fails, tries to rollback the move.
+
+        Callers that already hold the video (with tags/actors loaded) can pass it
+        as `video` to skip the lookup query.
         """
-        # Load video with tags and actors
-        result = await self.db.execute(
-            select(Video).options(selectinload(Video.tags), selectinload(Video.actors)).where(Video.id == video_id)
-        )
-        video: Video = result.scalar_one_or_none()
+        if video is None:
+            # Load video with tags and actors
+            result = await self.db.execute(
+                select(Video).options(selectinload(Video.tags), selectinload(Video.actors)).where(Video.id == video_id)
+            )
+            video = result.scalar_one_or_none()
         if not video:
             return None
 
         original_path = Path(video.path)
-        if not original_path.exists():
+        if not await asyncio.to_thread(original_path.exists):
             # File missing - treat as not movable
             return None
 
@@ -558,8 +590,6 @@ class VideoService:
                 # Build nested path
                 for part in subcategory_parts:
                     dest_dir = dest_dir / part
-            
-            dest_dir.mkdir(parents=True, exist_ok=True)
 
         # Determine destination filename
         orig_ext = original_path.suffix
@@ -571,22 +601,12 @@ class VideoService:
             new_name = original_path.name
 
         destination = dest_dir / new_name
-        if destination.exists():
-            raise FileExistsError("Destination file already exists")
 
-        # Perform move
-        destination_parent = destination.parent
-        destination_parent.mkdir(parents=True, exist_ok=True)
-        original_parent = original_path.parent
-        try:
-            original_path.rename(destination)
-        except Exception as e:
-            raise RuntimeError(f"Filesystem move failed: {e}")
+        # Perform move (blocking filesystem calls run in a worker thread)
+        stat = await asyncio.to_thread(self._move_file, original_path, destination)
 
         # Update DB metadata
         try:
-            stat = destination.stat()
-
             # Update thumbnail hash before updating video path
             if self.thumbnail_db:
                 await self.thumbnail_db.update_path_hash(str(original_path), str(destination))
@@ -615,13 +635,38 @@ class VideoService:
             # Rollback DB and attempt to revert filesystem move
             await self.db.rollback()
             try:
-                destination.rename(original_path)
+                await asyncio.to_thread(destination.rename, original_path)
             except Exception:
                 pass  # At this point we log in real-world scenario
             raise RuntimeError(f"Database update failed after move: {e}")
 
         return video
 
+    @staticmethod
+    def _move_file(original_path: Path, destination: Path) -> os.stat_result:
+        """Filesystem half of move_video: create the target folder, rename, stat.
+
+        Blocking - call through asyncio.to_thread. The file is moved back if
+        stat fails so callers never see a half-done move.
+        """
+        if destination.exists():
+            raise FileExistsError("Destination file already exists")
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            original_path.rename(destination)
+        except Exception as e:
+            raise RuntimeError(f"Filesystem move failed: {e}")
+
+        try:
+            return destination.stat()
+        except Exception as e:
+            try:
+                destination.rename(original_path)
+            except Exception:
+                pass
+            raise RuntimeError(f"Filesystem move failed: {e}")
+
     async def prune_missing_files(self) -> int:
         """Delete DB video rows whose files no longer exist. Returns count removed."""
         result = await self.db.execute(select(Video))
@@ -640,9 +685,6 @@ class VideoService:
 
         Returns a dict mapping video_id -> list of face dicts with fallback embeddings
         """
-        from database import VideoFace, FaceID, FaceEncoding
-        from sqlalchemy import select, and_
-
         if not video_ids:
             return {}
 
@@ -655,28 +697,12 @@ class VideoService:
 
         video_faces = video_faces_result.all()
 
-        # Get best thumbnails for all faces (batch query)
+        # Get all embeddings for these faces in one batch query, best quality first.
+        # The first embedding of each face doubles as its primary thumbnail.
         face_ids = list(set(vf.face_id for vf, _ in video_faces))
+        best_thumbnail_map = {}
+        embeddings_map = {}
         if face_ids:
-            # Get best encoding for each face from ANY video (for primary thumbnail)
-            best_encodings_result = await self.db.execute(
-                select(
-                    FaceEncoding.face_id,
-                    FaceEncoding.thumbnail,
-                    FaceEncoding.quality_score
-                )
-                .where(FaceEncoding.face_id.in_(face_ids))
-                .distinct(FaceEncoding.face_id)
-                .order_by(FaceEncoding.face_id, FaceEncoding.quality_score.desc())
-            )
-
-            # Build best thumbnail map: face_id -> thumbnail
-            best_thumbnail_map = {}
-            for row in best_encodings_result.all():
-                if row.face_id not in best_thumbnail_map:
-                    best_thumbnail_map[row.face_id] = row.thumbnail
-
-            # Get all embeddings for fallback (for images)
             all_encodings_result = await self.db.execute(
                 select(
                     FaceEncoding.face_id,
@@ -689,18 +715,15 @@ class VideoService:
             )
 
             # Build embeddings map: face_id -> list of embedding dicts
-            embeddings_map = {}
             for row in all_encodings_result.all():
                 if row.face_id not in embeddings_map:
                     embeddings_map[row.face_id] = []
+                    best_thumbnail_map[row.face_id] = row.thumbnail
                 embeddings_map[row.face_id].append({
                     "id": row.id,
                     "thumbnail": row.thumbnail,
                     "quality_score": row.quality_score
                 })
-        else:
-            best_thumbnail_map = {}
-            embeddings_map = {}
 
         # Build result dict
         result = {}
@@ -744,11 +767,6 @@ class VideoService:
             ValueError: If folder doesn't exist, is not a top-level category, or new name is invalid
             RuntimeError: If filesystem or database update fails
         """
-        import logging
-        from database import Category, FolderScanStatus
-        
-        logger = logging.getLogger(__name__)
-        
         # Validate inputs
         if not old_folder_path.exists() or not old_folder_path.is_dir():
             raise ValueError(f"Folder does not exist: {old_folder_path}")